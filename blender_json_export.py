@@ -1,75 +1,995 @@
-import json, gzip, os
+import json, gzip, base64, fnmatch, hashlib, lzma, os, pickle, struct, subprocess, tempfile, time, zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
-def export(kwargs):
-	node = kwargs['node']
-	out_file = str(node.parm("out_file").eval())
-	startFrame = int(node.parm("frame_rangex").eval())
-	endFrame = int(node.parm("frame_rangey").eval())
+# Attribute classes exported, mapped to the Houdini lookup used to find them per frame
+ATTRIB_CLASSES = {
+	"detail": "findGlobalAttrib",
+	"prim": "findPrimAttrib",
+	"point": "findPointAttrib",
+	"vertex": "findVertexAttrib"
+}
+
+# Group classes exported, mapped to the Houdini lookups used to list and find them
+GROUP_CLASSES = {
+	"prim": ("primGroups", "findPrimGroup"),
+	"point": ("pointGroups", "findPointGroup"),
+	"vertex": ("vertexGroups", "findVertexGroup")
+}
+
+# Intrinsics holding the number of elements in each class
+COUNT_INTRINSICS = {
+	"prim": "primitivecount",
+	"point": "pointcount",
+	"vertex": "vertexcount"
+}
+
+# Kept points are read one by one below this fraction of the point count, as bulk reads get every point's values
+SPARSE_READ_FRACTION = 0.01
+
+def parm_value(node, name, default):
+	"""Evaluate a parameter, or use a default for HDAs saved before it existed"""
+	parm = node.parm(name)
+	return default if parm is None else parm.eval()
+
+def parm_at_default(node, name):
+	"""Whether a parameter was left at its default, or doesn't exist on HDAs saved before it"""
+	parm = node.parm(name)
+	return parm is None or parm.isAtDefault()
+
+def match_pattern(pattern, name):
+	"""Houdini style pattern match, later patterns win and patterns starting with ^ exclude"""
+	matched = False
+	for token in pattern.split():
+		if token.startswith("^"):
+			if fnmatch.fnmatchcase(name, token[1:]):
+				matched = False
+		elif fnmatch.fnmatchcase(name, token):
+			matched = True
+	return matched
+
+def elements(geo, cls):
+	if cls == "vertex":
+		return [vertex for prim in geo.prims() for vertex in prim.vertices()]
+	return geo.prims() if cls == "prim" else geo.points()
+
+def vertex_topology(geo):
+	"""Point and prim number of every vertex in Houdini's vertex order, so the importer can match them to corners"""
+	points = []
+	prims = []
+	for prim in geo.prims():
+		for vertex in prim.vertices():
+			points.append(vertex.point().number())
+			prims.append(prim.number())
+	return {"point": np.array(points, dtype=np.int32), "prim": np.array(prims, dtype=np.int32)}
+
+class IndexedStrings:
+	"""String values stored as a table of unique strings and an index per element"""
+	def __init__(self, strings, ids):
+		self.strings = strings
+		self.ids = ids
+
+	@classmethod
+	def from_values(cls, values):
+		lookup = {}
+		ids = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values), dtype=np.int32, count=len(values))
+		return cls(list(lookup), ids)
+
+	def __len__(self):
+		return len(self.ids)
+
+def group_mask(geo, cls, group):
+	"""Membership of every element in a group as a boolean array"""
+	mask = np.zeros(geo.intrinsicValue(COUNT_INTRINSICS[cls]), dtype=bool)
+	if cls == "point":
+		members = [point.number() for point in group.iterPoints()]
+	elif cls == "prim":
+		members = [prim.number() for prim in group.iterPrims()]
+	else:
+		members = [vertex.linearNumber() for vertex in group.vertices()]
+	mask[members] = True
+	return mask
+
+def pack_group(mask):
+	"""Store a group as ranges of members if it's sparse, otherwise as a packed bitset"""
+	# Alternating starts and ends of each run of members
+	edges = np.flatnonzero(np.diff(mask.astype(np.int8), prepend=0, append=0))
+	if len(edges) * 32 < len(mask):
+		return {"count": len(mask), "ranges": edges.tolist()}
+	return {"count": len(mask), "bits": base64.b64encode(np.packbits(mask).tobytes()).decode("ascii")}
+
+def read_attrib(geo, cls, attr, index=None):
+	"""Read every value of an attribute with one bulk call, falling back to per element reads.
+
+	If index is given, only the elements with those numbers are kept. Bulk reads still get every element,
+	so when only a few are kept they're read one by one instead.
+	"""
+	name = attr.name()
+	if cls == "detail":
+		return geo.attribValue(name)
+
+	data_type = attr.dataType()
+	size = attr.size()
+
+	# Arrays, dicts and string tuples have no bulk getters
+	if attr.isArrayType() or data_type not in (hou.attribData.Float, hou.attribData.Int, hou.attribData.String) \
+			or (data_type == hou.attribData.String and size != 1):
+		if index is None:
+			return [elem.attribValue(name) for elem in elements(geo, cls)]
+		find = geo.prim if cls == "prim" else geo.point
+		return [find(i).attribValue(name) for i in index.tolist()]
+
+	if index is not None and len(index) < geo.intrinsicValue(COUNT_INTRINSICS[cls]) * SPARSE_READ_FRACTION:
+		find = geo.prim if cls == "prim" else geo.point
+		values = [find(i).attribValue(name) for i in index.tolist()]
+		if data_type == hou.attribData.String:
+			return IndexedStrings.from_values(values)
+		values = np.array(values, dtype=np.float32 if data_type == hou.attribData.Float else np.int32)
+		return values if size == 1 else values.reshape(-1, size)
+
+	if data_type == hou.attribData.String:
+		values = getattr(geo, f"{cls}StringAttribValues")(name)
+		if index is not None:
+			values = [values[i] for i in index.tolist()]
+		return IndexedStrings.from_values(values)
+
+	# Blender stores attributes as 32 bit, so read them as 32 bit too
+	if data_type == hou.attribData.Float:
+		raw = getattr(geo, f"{cls}FloatAttribValuesAsString")(name, float_type=hou.numericData.Float32)
+		values = np.frombuffer(raw, dtype=np.float32)
+	else:
+		raw = getattr(geo, f"{cls}IntAttribValuesAsString")(name, int_type=hou.numericData.Int32)
+		values = np.frombuffer(raw, dtype=np.int32)
+	values = values if size == 1 else values.reshape(-1, size)
+	return values if index is None else values[index]
+
+def attrib_schema(geo, cls, attr):
+	"""Describe an attribute's type, so the importer doesn't need to guess it from the values"""
+	return {
+		"storage": attr.dataType().name(),
+		"size": attr.size(),
+		"array": attr.isArrayType(),
+		"qualifier": attr.qualifier(),
+		"count": geo.intrinsicValue(COUNT_INTRINSICS[cls]) if cls in COUNT_INTRINSICS else 1
+	}
+
+def select_points(geo, filters):
+	"""Numbers of the points kept by the bounding box, group and sampling filters, or None to keep them all.
+
+	The bounding box filter reads every point's position.
+	"""
+	if not filters:
+		return None
+	keep = np.ones(geo.intrinsicValue("pointcount"), dtype=bool)
+
+	if "bbox" in filters:
+		low, high = (np.asarray(bound, dtype=np.float32) for bound in filters["bbox"])
+		positions = np.frombuffer(geo.pointFloatAttribValuesAsString("P", float_type=hou.numericData.Float32), dtype=np.float32).reshape(-1, 3)
+		keep &= ((positions >= low) & (positions <= high)).all(axis=1)
+
+	if "group" in filters:
+		members = np.zeros_like(keep)
+		for group in geo.pointGroups():
+			if match_pattern(filters["group"], group.name()):
+				members[[point.number() for point in group.iterPoints()]] = True
+		keep &= members
+
+	return np.flatnonzero(keep)[::filters.get("step", 1)]
+
+def capture_frame(geo, spec):
+	"""Read the attributes named in the spec from the geometry, only keeping the points that pass its filters"""
+	index = select_points(geo, spec["filters"])
+	frame_data = {}
+	for cls, attribs in spec["names"].items():
+		find = getattr(geo, ATTRIB_CLASSES[cls])
+		frame_data[cls] = {}
+		for name in attribs:
+			attr = find(name)
+			frame_data[cls][name] = None if attr is None else read_attrib(geo, cls, attr, index if cls == "point" else None)
+	# Point numbers are stored like an attribute, so the importer can write to the right points
+	if index is not None:
+		frame_data["index"] = {"point": index.astype(np.int32)}
+	for cls, groups in spec["groups"].items():
+		find = getattr(geo, GROUP_CLASSES[cls][1])
+		frame_data[f"{cls}_group"] = {}
+		for name in groups:
+			group = find(name)
+			mask = None if group is None else group_mask(geo, cls, group)
+			frame_data[f"{cls}_group"][name] = mask[index] if mask is not None and cls == "point" and index is not None else mask
+	# Static topology is read once by the job, after the first frame it's never written again as it doesn't change
+	if spec["names"].get("vertex") or spec["groups"].get("vertex"):
+		topology = spec.get("topology") or vertex_topology(geo)
+		frame_data["topology"] = {name: np.asarray(values, dtype=np.int32) for name, values in topology.items()}
+	return frame_data
+
+def plain_frame(frame_data):
+	"""Swap IndexedStrings for tuples, classes defined in an HDA module can't be unpickled elsewhere"""
+	return {cls: {name: (value.strings, value.ids) if isinstance(value, IndexedStrings) else value
+		for name, value in attribs.items()} for cls, attribs in frame_data.items()}
+
+def restore_frame(frame_data):
+	# Only string attributes are captured as tuples
+	return {cls: {name: IndexedStrings(*value) if isinstance(value, tuple) and cls != "detail" else value
+		for name, value in attribs.items()} for cls, attribs in frame_data.items()}
+
+def to_json(value):
+	return value.tolist() if isinstance(value, np.ndarray) else value
+
+def frame_counts(frame_data):
+	"""Number of elements in each class, taken from the first attribute that has a value"""
+	counts = {}
+	for cls, attribs in frame_data.items():
+		if cls == "detail":
+			continue
+		for value in attribs.values():
+			if value is not None:
+				counts[cls] = len(value)
+				break
+	return counts
+
+def bits(values):
+	"""View a numeric array as unsigned ints, so comparisons are exact and NaN safe"""
+	values = np.ascontiguousarray(values)
+	return values.view(f"u{values.itemsize}")
+
+def changed_elements(value, old):
+	"""Indices of the elements that differ between two frames of the same length"""
+	if isinstance(value, np.ndarray):
+		diff = bits(value) != bits(old)
+		if diff.ndim > 1:
+			diff = diff.any(axis=1)
+		return np.flatnonzero(diff)
+	return [i for i, (a, b) in enumerate(zip(value, old)) if a != b]
+
+def encode_value(value, old, missing=False, sparse=True):
+	"""Compare a value against the same attribute on a reference frame, returning None if it's unchanged.
+
+	Otherwise returns a payload with either the full value, or the indices and values of the changed elements
+	if sparse updates are allowed.
+	"""
+	if isinstance(value, IndexedStrings):
+		# Strings are compared through their ids, which only works while the table stays the same
+		if missing or not isinstance(old, IndexedStrings) or value.strings != old.strings:
+			return {"strings": value.strings, "value": value.ids}
+		value, old = value.ids, old.ids
+
+	if missing:
+		return {"value": value}
+
+	if isinstance(value, np.ndarray) and isinstance(old, np.ndarray) and value.shape == old.shape and value.dtype == old.dtype:
+		changed = changed_elements(value, old)
+	elif isinstance(value, list) and isinstance(old, list) and len(value) == len(old):
+		changed = changed_elements(value, old)
+	else:
+		# Detail values and attributes that changed size are compared as a whole
+		if type(value) == type(old) and not isinstance(value, np.ndarray) and value == old:
+			return None
+		return {"value": value}
+
+	if len(changed) == 0:
+		return None
+	# Sparse updates store an index per element, so they only pay off when few elements change
+	if sparse and len(changed) * 4 < len(value):
+		if isinstance(value, np.ndarray):
+			return {"index": changed, "value": value[changed]}
+		return {"index": changed, "value": [value[i] for i in changed]}
+	return {"value": value}
+
+# QUANTIZATION
+
+def quantize_half(values):
+	half = values.astype(np.float16)
+	return {"q": "half", "value": half.view(np.uint16)}, half.astype(np.float32)
+
+def quantize_fixed(values):
+	"""Map each component onto 16 bit ints between its minimum and maximum on this frame"""
+	low = values.min(axis=0).astype(np.float64)
+	high = values.max(axis=0).astype(np.float64)
+	scale = (high - low) / 65535
+	steps = np.round((values - low) / np.where(scale > 0, scale, 1)) - 32768
+	fixed = steps.astype(np.int16)
+	decoded = ((fixed + 32768.0) * scale + low).astype(np.float32)
+	return {"q": "fixed", "value": fixed, "range": [low.tolist(), high.tolist()]}, decoded
+
+def octahedral_decode(packed):
+	xy = packed.astype(np.float64) / 32767
+	z = 1 - np.abs(xy).sum(axis=1)
+	fold = np.clip(-z, 0, None)[:, None]
+	xy -= np.where(xy >= 0, 1, -1) * fold
+	vectors = np.column_stack((xy, z))
+	return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+def quantize_octahedral(values):
+	"""Fold unit vectors onto an octahedron and store them as two 16 bit ints"""
+	lengths = np.abs(values).sum(axis=1, keepdims=True)
+	xy = values[:, :2] / np.where(lengths > 0, lengths, 1)
+	lower = values[:, 2] < 0
+	signs = np.where(xy >= 0, 1, -1)
+	xy[lower] = ((1 - np.abs(xy[lower][:, ::-1])) * signs[lower])
+	packed = np.round(np.clip(xy, -1, 1) * 32767).astype(np.int16)
+	return {"q": "oct", "value": packed}, octahedral_decode(packed)
+
+QUANTIZERS = {
+	"half": quantize_half,
+	"fixed": quantize_fixed,
+	"octahedral": quantize_octahedral
+}
+
+# Octahedral packing only keeps directions, vectors this far from unit length are written at full precision
+UNIT_TOLERANCE = 1e-3
+
+def quantize(mode, values, tolerance):
+	"""Quantize float values, returning the payload and its max error, or None if the error is out of bounds"""
+	if len(values) == 0 or not np.isfinite(values).all():
+		return None
+	if mode == "octahedral" and np.abs(np.linalg.norm(values, axis=1) - 1).max() > UNIT_TOLERANCE:
+		return None
+	with np.errstate(over="ignore", invalid="ignore"):
+		payload, decoded = QUANTIZERS[mode](values)
+		error = float(np.abs(decoded - values).max())
+	if not np.isfinite(error) or (tolerance > 0 and error > tolerance):
+		return None
+	return payload, error
+
+class FrameEncoder:
+	"""Stores each frame relative to an earlier one, so unchanged attributes are only written once.
+
+	The first frame is stored in full as the base. Every key_interval frames a keyframe is stored against the base
+	instead of the previous frame, so readers can start decoding there without replaying the whole file.
+	Float attributes with a quantize mode in the schema are quantized unless that goes over the tolerance.
+	Without sparse updates, changed attributes are always stored whole so each one can be read on its own.
+	"""
+	def __init__(self, key_interval=0, schema=None, tolerance=0, sparse=True):
+		self.key_interval = key_interval
+		self.schema = schema or {}
+		self.tolerance = tolerance
+		self.sparse = sparse
+		# Worst quantization error of each attribute
+		self.errors = {}
+		self.base = None
+		self.prev = None
+		self.count = 0
+
+	def next_ref(self):
+		"""Which frame the next record will be stored against"""
+		if self.base is None:
+			return "none"
+		if self.key_interval > 0 and self.count % self.key_interval == 0:
+			return "base"
+		return "prev"
+
+	def reference(self, ref):
+		# Frames spliced from the cache are only loaded if a later frame needs them
+		if ref == "none":
+			return {}
+		if ref == "base":
+			if callable(self.base):
+				self.base = self.base()
+			return self.base
+		if callable(self.prev):
+			self.prev = self.prev()
+		return self.prev
+
+	def advance(self, frame_data):
+		"""Move on to the next frame, frame_data can be a function that loads it on demand"""
+		if self.base is None:
+			self.base = frame_data
+		self.prev = frame_data
+		self.count += 1
+
+	def pack(self, cls, name, payload):
+		"""Quantize a payload if requested, arrays are left for the writer to store"""
+		mode = self.schema.get(cls, {}).get(name, {}).get("quantize")
+		value = payload["value"]
+		if mode and isinstance(value, np.ndarray):
+			quantized = quantize(mode, value, self.tolerance)
+			if quantized is not None:
+				packed, error = quantized
+				self.errors[cls, name] = max(self.errors.get((cls, name), 0), error)
+				payload = {**payload, **packed}
+		return payload
+
+	def encode(self, frame_data):
+		ref = self.next_ref()
+		reference = self.reference(ref)
+
+		record = {"ref": ref, "count": frame_counts(frame_data)}
+		for cls, attribs in frame_data.items():
+			record[cls] = {}
+			old_attribs = reference.get(cls, {})
+			for name, value in attribs.items():
+				payload = encode_value(value, old_attribs.get(name), name not in old_attribs, self.sparse)
+				if payload is None:
+					continue
+				# Changed groups are always stored whole, they're already tiny
+				if cls.endswith("_group") and value is not None:
+					record[cls][name] = pack_group(value)
+				else:
+					record[cls][name] = self.pack(cls, name, payload)
+
+		self.advance(frame_data)
+		return record
+
+# Streamed files start with a header line followed by one line per frame
+FORMAT = "houdini_attributes"
+VERSION = 4
+
+# Each chunk is compressed as its own stream, readers detect the codec from the first bytes
+CODECS = {
+	"none": lambda data, level: data,
+	# Zero mtime keeps the output identical between runs
+	"gzip": lambda data, level: gzip.compress(data, level, mtime=0),
+	"zlib": lambda data, level: zlib.compress(data, level),
+	"lzma": lambda data, level: lzma.compress(data, preset=level)
+}
+
+# Chunks are cut early past this size, so memory stays bounded without keyframes
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+
+class AttributeWriter:
+	"""Writes frames in chunks which are compressed independently, so only one chunk is held in memory.
+
+	A new chunk starts on every keyframe. With threads, chunks are compressed in parallel but still written in order.
+	"""
+	def __init__(self, out_file, header, encoder, codec="gzip", level=9, threads=1):
+		self.encoder = encoder
+		self.codec = CODECS[codec]
+		self.level = level
+		self.threads = threads
+		self.pool = ThreadPoolExecutor(threads) if threads > 1 else None
+		self.pending = deque()
+		self.chunk = []
+		self.chunk_size = 0
+		self.file = open(out_file, "wb")
+		self.write_line({"format": FORMAT, "version": VERSION, "codec": codec, **header})
+		self.flush()
+
+	def write_line(self, data):
+		line = (json.dumps(data, default=to_json) + "\n").encode("utf-8")
+		self.chunk.append(line)
+		self.chunk_size += len(line)
+		return line
+
+	def start_frame(self):
+		if self.encoder.next_ref() != "prev" or self.chunk_size > MAX_CHUNK_BYTES:
+			self.flush()
+
+	def write_frame(self, frame, frame_data):
+		"""Encode and write a frame, returning the encoded line"""
+		self.start_frame()
+		return self.write_line({"frame": frame, **self.encoder.encode(frame_data)})
+
+	def write_encoded(self, line, load_frame):
+		"""Write a frame encoded by an earlier export, load_frame is only called if a later frame needs it"""
+		self.start_frame()
+		self.chunk.append(line)
+		self.chunk_size += len(line)
+		self.encoder.advance(load_frame)
+
+	def flush(self):
+		"""Compress the current chunk, on a worker thread if there are any"""
+		if not self.chunk:
+			return
+		data = b"".join(self.chunk)
+		self.chunk = []
+		self.chunk_size = 0
+		if self.pool is None:
+			self.file.write(self.codec(data, self.level))
+			return
+		self.pending.append(self.pool.submit(self.codec, data, self.level))
+		# Only a few chunks are kept in flight, so memory doesn't grow with the frame range
+		while len(self.pending) > self.threads:
+			self.file.write(self.pending.popleft().result())
+
+	def close(self):
+		self.flush()
+		while self.pending:
+			self.file.write(self.pending.popleft().result())
+		if self.pool is not None:
+			self.pool.shutdown()
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
 
-	json_out = {
+# Binary files start with a fixed header pointing to a JSON index stored after the arrays
+BINARY_FORMAT = "houdini_attributes_binary"
+BINARY_MAGIC = b"HATTRBIN"
+BINARY_HEADER = struct.Struct("<8sIIQQ")
+
+class BinaryWriter:
+	"""Writes every array of every frame as its own little endian block, followed by an index of where they are.
+
+	The index lists each frame's payloads like a streamed file, with arrays swapped for their offset, length,
+	dtype and shape. Uncompressed blocks can be memory mapped and read in place, compressed ones are
+	compressed on their own so any of them can be read without the rest.
+	"""
+	def __init__(self, out_file, header, encoder, codec="none", level=9, threads=1):
+		self.encoder = encoder
+		self.codec = CODECS[codec]
+		self.level = level
+		self.header = {"format": BINARY_FORMAT, "version": VERSION, "codec": codec, **header}
+		self.frames = []
+		self.file = open(out_file, "wb")
+		self.file.write(BINARY_HEADER.pack(BINARY_MAGIC, VERSION, 0, 0, 0))
+
+	def write_block(self, array):
+		array = np.ascontiguousarray(array)
+		array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+		# Blocks are aligned, so memory mapped arrays are too
+		self.file.write(b"\0" * (-self.file.tell() % 16))
+		offset = self.file.tell()
+		data = self.codec(array.tobytes(), self.level)
+		self.file.write(data)
+		return {"block": [offset, len(data), array.dtype.str, list(array.shape)]}
+
+	def write_record(self, frame, record):
+		entry = {"frame": frame, "ref": record["ref"], "count": record["count"]}
+		for cls, payloads in record.items():
+			if cls in ("ref", "count"):
+				continue
+			entry[cls] = {name: {key: self.write_block(value) if isinstance(value, np.ndarray) else value
+				for key, value in payload.items()} for name, payload in payloads.items()}
+		self.frames.append(entry)
+
+	def write_frame(self, frame, frame_data):
+		"""Encode and write a frame, returning the encoded record so it can be cached"""
+		record = self.encoder.encode(frame_data)
+		self.write_record(frame, record)
+		return pickle.dumps((frame, record), protocol=pickle.HIGHEST_PROTOCOL)
+
+	def write_encoded(self, data, load_frame):
+		"""Write a frame encoded by an earlier export, load_frame is only called if a later frame needs it"""
+		self.write_record(*pickle.loads(data))
+		self.encoder.advance(load_frame)
+
+	def close(self):
+		index = json.dumps({**self.header, "samples": self.frames}, default=to_json).encode("utf-8")
+		offset = self.file.tell()
+		self.file.write(index)
+		self.file.seek(0)
+		self.file.write(BINARY_HEADER.pack(BINARY_MAGIC, VERSION, 0, offset, len(index)))
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+class FrameCache:
+	"""Keeps each frame's captured arrays and encoded line on disk, so re-exports only redo frames that changed.
+
+	Captures are keyed on a hash of the frame's input geometry. Encoded lines are keyed on a chain of hashes
+	covering every frame they were encoded against, so a change invalidates frames up to the next keyframe.
+	"""
+	def __init__(self, cache_dir, settings):
+		os.makedirs(cache_dir, exist_ok=True)
+		self.dir = cache_dir
+		self.settings = hashlib.sha1(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+		self.files = set(os.listdir(cache_dir))
+
+	def key(self, parent, geo_hash):
+		return hashlib.sha1(f"{self.settings}{parent}{geo_hash}".encode("utf-8")).hexdigest()
+
+	def path(self, name):
+		return os.path.join(self.dir, name)
+
+	def has(self, frame, key, ext):
+		return f"{frame}_{key}.{ext}" in self.files
+
+	def read(self, frame, key, ext):
+		with open(self.path(f"{frame}_{key}.{ext}"), "rb") as cache_file:
+			return cache_file.read()
+
+	def write(self, frame, key, ext, data):
+		# Only the latest entry is kept for each frame
+		for name in [name for name in self.files if name.startswith(f"{frame}_") and name.endswith(f".{ext}")]:
+			os.remove(self.path(name))
+			self.files.discard(name)
+		# Written under a temporary name, so an interrupted export never leaves a broken entry
+		name = f"{frame}_{key}.{ext}"
+		with open(self.path(name + ".tmp"), "wb") as cache_file:
+			cache_file.write(data)
+		os.replace(self.path(name + ".tmp"), self.path(name))
+		self.files.add(name)
+
+	def read_capture(self, frame, geo_hash):
+		return restore_frame(pickle.loads(self.read(frame, geo_hash, "pkl")))
+
+	def write_capture(self, frame, geo_hash, frame_data):
+		self.write(frame, geo_hash, "pkl", pickle.dumps(plain_frame(frame_data), pickle.HIGHEST_PROTOCOL))
+
+def geometry_hash(geo):
+	return hashlib.sha1(geo.data()).hexdigest()
+
+# Run by each hython worker, cooks its share of the frames in a copy of the saved scene
+WORKER_SCRIPT = """
+import json, sys, hou
+with open(sys.argv[1]) as job_file:
+	job = json.load(job_file)
+hou.hipFile.load(job["hip"], suppress_save_prompt=True, ignore_load_warnings=True)
+node = hou.node(job["node"])
+node.hdaModule().write_frames(node, job["frames"], job["spec"], job["out"], job["hashed"])
+"""
+
+def write_frames(node, frames, spec, out_path, hashed=False):
+	"""Cook frames and pickle the geometry hashes and captured arrays one after another"""
+	with open(out_path, "wb") as out:
+		for frame in frames:
+			geo = node.inputGeometryAtFrame(frame, 0)
+			geo_hash = geometry_hash(geo) if hashed else None
+			pickle.dump((geo_hash, plain_frame(capture_frame(geo, spec))), out, pickle.HIGHEST_PROTOCOL)
+
+def split_frames(frames, count):
+	"""Split frames into contiguous blocks, so sims only step forward within a worker"""
+	size, extra = divmod(len(frames), count)
+	blocks = []
+	start = 0
+	for i in range(count):
+		end = start + size + (1 if i < extra else 0)
+		if end > start:
+			blocks.append(frames[start:end])
+		start = end
+	return blocks
+
+def cook_frames_parallel(node, frames, spec, workers, hashed, progress):
+	"""Cook frames in hython worker processes, yielding them back in frame order"""
+	if hou.hipFile.hasUnsavedChanges():
+		raise hou.Error("Please save the scene before exporting with multiple workers")
+
+	hython = os.path.join(os.environ.get("HB", ""), "hython")
+	with tempfile.TemporaryDirectory() as temp_dir:
+		jobs = []
+		for i, block in enumerate(split_frames(frames, workers)):
+			job = {
+				"hip": hou.hipFile.path(),
+				"node": node.path(),
+				"frames": block,
+				"spec": spec,
+				"hashed": hashed,
+				"out": os.path.join(temp_dir, f"frames_{i}.pkl")
+			}
+			job_path = os.path.join(temp_dir, f"job_{i}.json")
+			with open(job_path, "w") as job_file:
+				json.dump(job, job_file, default=to_json)
+			# Errors go to a file, a full pipe would stall the worker
+			with open(os.path.join(temp_dir, f"errors_{i}.txt"), "wb") as err_file:
+				process = subprocess.Popen([hython, "-c", WORKER_SCRIPT, job_path], stderr=err_file)
+			jobs.append((job, process))
+
+		# Workers are killed if the export is interrupted while they're running
+		try:
+			while any(process.poll() is None for _, process in jobs):
+				done = sum(len(job["frames"]) for job, process in jobs if process.poll() is not None)
+				progress(done / len(frames))
+				time.sleep(0.1)
+		finally:
+			for _, process in jobs:
+				if process.poll() is None:
+					process.kill()
+
+		for i, (job, process) in enumerate(jobs):
+			if process.returncode != 0:
+				with open(os.path.join(temp_dir, f"errors_{i}.txt"), "rb") as err_file:
+					err = err_file.read().decode(errors="replace")
+				raise hou.Error(f"Export worker failed on frames {job['frames'][0]}-{job['frames'][-1]}:\n{err}")
+
+		# Blocks are contiguous, so reading them in order gives the same result as the serial path
+		for job, _ in jobs:
+			with open(job["out"], "rb") as frames_file:
+				for frame in job["frames"]:
+					geo_hash, frame_data = pickle.load(frames_file)
+					yield frame, geo_hash, lambda frame_data=restore_frame(frame_data): frame_data
+
+def cook_frames(node, frames, spec, workers=1, hashed=False, progress=lambda fraction: None):
+	"""Yield each frame in order with its geometry hash and a function capturing its attributes.
+
+	The capture must be called before moving on to the next frame.
+	"""
+	if workers > 1 and len(frames) > 1:
+		yield from cook_frames_parallel(node, frames, spec, workers, hashed, progress)
+		return
+	for frame in frames:
+		geo = node.inputGeometryAtFrame(frame, 0)
+		geo_hash = geometry_hash(geo) if hashed else None
+		yield frame, geo_hash, lambda geo=geo: capture_frame(geo, spec)
+
+def build_schema(node, patterns, group_pattern, quantize_patterns):
+	"""Describe the attributes and groups on the node's input matching the patterns, with their quantize mode"""
+	schema = {
 		"detail": {},
 		"prim": {},
 		"point": {},
-		#"vertex": {}
+		"vertex": {}
 	}
 
 	geo = node.inputGeometry(0)
 
 	# GROUPS
 
-	#for group in geo.primGroups():
-		#print(group)
-	
-	#for group in geo.pointGroups():
-		#print(group)
-	
+	# Groups are stored as boolean masks, written as bitsets or ranges
+	for cls, (list_groups, _) in GROUP_CLASSES.items():
+		count = geo.intrinsicValue(COUNT_INTRINSICS[cls])
+		entries = {group.name(): {"storage": "Group", "size": 1, "array": False, "qualifier": "", "count": count}
+			for group in getattr(geo, list_groups)() if match_pattern(group_pattern, group.name())}
+		if entries:
+			schema[f"{cls}_group"] = entries
+
+	# Edges have no element of their own to store a mask against
 	#for group in geo.edgeGroups():
 		#print(group)
-	
-	#for group in geo.vertexGroups():
-		#print(group)
 
 	# ATTRIBUTES
 
 	# Detail attributes are imported to Blender as custom data
 	for attr in geo.globalAttribs():
-		json_out["detail"][attr.name()] = []
+		if match_pattern(patterns["detail"], attr.name()):
+			schema["detail"][attr.name()] = attrib_schema(geo, "detail", attr)
 	
 	for attr in geo.primAttribs():
-		json_out["prim"][attr.name()] = []
+		if match_pattern(patterns["prim"], attr.name()):
+			schema["prim"][attr.name()] = attrib_schema(geo, "prim", attr)
 
 	for attr in geo.pointAttribs():
-		json_out["point"][attr.name()] = []
+		if match_pattern(patterns["point"], attr.name()):
+			schema["point"][attr.name()] = attrib_schema(geo, "point", attr)
 	
-	#for attr in geo.vertexAttribs():
-		#json_out["vertex"][attr.name()] = []
+	for attr in geo.vertexAttribs():
+		if match_pattern(patterns["vertex"], attr.name()):
+			schema["vertex"][attr.name()] = attrib_schema(geo, "vertex", attr)
 
-	for frame in range(startFrame, endFrame + 1):
-		geo = node.inputGeometryAtFrame(frame, 0)
+	# Only plain float attributes can be quantized, and only vectors can be octahedral
+	for cls in ("prim", "point", "vertex"):
+		for name, entry in schema[cls].items():
+			if entry["storage"] != "Float" or entry["array"]:
+				continue
+			for mode, pattern in quantize_patterns.items():
+				if match_pattern(pattern, name) and (mode != "octahedral" or entry["size"] == 3):
+					entry["quantize"] = mode
 
-		for attr in json_out["detail"]:
-			json_out["detail"][attr].append(geo.attribValue(attr))
-
-		for attr in json_out["prim"]:
-			frame_data = []
-			for prim in geo.prims():
-				frame_data.append(prim.attribValue(attr))
-			json_out["prim"][attr].append(frame_data)
-
-		for attr in json_out["point"]:
-			frame_data = []
-			for point in geo.points():
-				frame_data.append(point.attribValue(attr))
-			json_out["point"][attr].append(frame_data)
-		
-		# TODO: Vertex data, not sure how to use glob vertices yet
-		# See https://www.sidefx.com/docs/houdini/hom/hou/Geometry.html#vertices
-	
-	if not os.path.exists(os.path.dirname(out_file)):
-		os.makedirs(os.path.dirname(out_file))
-
-	# Compress JSON data
-	json_str = json.dumps(json_out) + "\n"
-	json_bytes = json_str.encode("utf-8")
-	with gzip.open(out_file, "wb") as jsonfile:
-		jsonfile.write(json_bytes)
\ No newline at end of file
+	# Vertices are stored in Houdini's order, with the point and prim of each vertex to place them
+	if schema["vertex"] or "vertex_group" in schema:
+		count = geo.intrinsicValue("vertexcount")
+		schema["topology"] = {name: {"storage": "Int", "size": 1, "array": False, "qualifier": "", "count": count} for name in ("point", "prim")}
+	return schema
+
+def sample_time(time):
+	# Whole frames stay ints, so they look the same as before in the file and cache names
+	time = round(time, 6)
+	return int(time) if time.is_integer() else time
+
+def frame_range(node):
+	"""Sample times across the frame range, every frame_step frames with subframe_samples samples per step"""
+	startFrame = int(node.parm("frame_rangex").eval())
+	endFrame = int(node.parm("frame_rangey").eval())
+	step = float(parm_value(node, "frame_step", 1)) / max(int(parm_value(node, "subframe_samples", 1)), 1)
+	count = int((endFrame - startFrame) / step + 1e-6) + 1
+	return [sample_time(startFrame + i * step) for i in range(count)]
+
+class ExportJob:
+	"""Exports the attributes of one node, fed one cooked frame at a time"""
+	def __init__(self, node, out_file=None, frames=None):
+		self.node = node
+		self.out_file = out_file or str(node.parm("out_file").eval())
+		self.frames = frames or frame_range(node)
+		startFrame, endFrame = self.frames[0], self.frames[-1]
+		self.workers = int(parm_value(node, "workers", 1))
+		key_interval = int(parm_value(node, "key_interval", 100))
+		use_cache = bool(parm_value(node, "use_cache", 0))
+		# Space separated attribute patterns for each quantize mode
+		quantize_patterns = {mode: str(parm_value(node, f"quantize_{mode}", "")) for mode in QUANTIZERS}
+		tolerance = float(parm_value(node, "quantize_tolerance", 0.001))
+		codec = str(parm_value(node, "codec", "gzip"))
+		level = int(parm_value(node, "compression_level", 9))
+		threads = int(parm_value(node, "compression_threads", 1))
+		file_format = str(parm_value(node, "file_format", "json"))
+		# Binary files are only read in place when uncompressed, so they aren't compressed unless a codec is picked
+		if file_format == "binary" and parm_at_default(node, "codec"):
+			codec = "none"
+
+		# Internal attributes like __topology are skipped unless the patterns ask for them
+		patterns = {cls: str(parm_value(node, f"{cls}_pattern", "* ^__*")) for cls in ATTRIB_CLASSES}
+		filters = {}
+		if parm_value(node, "filter_bbox", 0):
+			filters["bbox"] = [list(node.parmTuple("bbox_min").eval()), list(node.parmTuple("bbox_max").eval())]
+		if parm_value(node, "filter_group", ""):
+			filters["group"] = str(parm_value(node, "filter_group", ""))
+		if int(parm_value(node, "point_step", 1)) > 1:
+			filters["step"] = int(parm_value(node, "point_step", 1))
+
+		group_pattern = str(parm_value(node, "group_pattern", "*"))
+		self.schema = build_schema(node, patterns, group_pattern, quantize_patterns)
+		# Points are matched by id on import, so point counts and order can change between frames
+		if parm_value(node, "key_by_id", 0):
+			geo = node.inputGeometry(0)
+			attr = geo.findPointAttrib("id")
+			if attr is None or attr.dataType() != hou.attribData.Int or attr.size() != 1:
+				raise hou.Error("Keying points by id needs an int id point attribute")
+			self.schema["point"]["id"] = {**attrib_schema(geo, "point", attr), "key": True}
+		if filters:
+			self.schema["index"] = {"point": {"storage": "Int", "size": 1, "array": False, "qualifier": "", "count": self.schema["point"].get("P", {}).get("count", 0)}}
+		self.spec = {
+			"names": {cls: list(attribs) for cls, attribs in self.schema.items() if cls in ATTRIB_CLASSES},
+			"groups": {cls: list(self.schema[f"{cls}_group"]) for cls in GROUP_CLASSES if f"{cls}_group" in self.schema},
+			"filters": filters
+		}
+		# Reading the vertex topology is slow, so it's only done once unless it changes over time
+		if self.schema.get("topology") and parm_value(node, "static_topology", 1):
+			self.spec["topology"] = vertex_topology(node.inputGeometry(0))
+
+		if not os.path.exists(os.path.dirname(self.out_file)):
+			os.makedirs(os.path.dirname(self.out_file))
+
+		self.cache = None
+		if use_cache:
+			settings = {"version": VERSION, "schema": self.schema, "start": startFrame, "key_interval": key_interval, "tolerance": tolerance, "filters": filters, "file_format": file_format}
+			self.cache = FrameCache(self.out_file + ".cache", settings)
+		self.base_hash = self.prev_key = ""
+
+		# Each frame is written out as soon as it's cooked instead of building one giant document
+		# Unchanged attributes are skipped and partly changed ones only store the changed elements
+		header = {"frames": [startFrame, endFrame], "schema": self.schema}
+		# Binary files are read an attribute at a time, so they can't use sparse updates
+		encoder = FrameEncoder(key_interval, self.schema, tolerance, sparse=file_format != "binary")
+		# Written under a temporary name, so a cancelled or failed export never replaces a good file
+		self.temp_file = f"{self.out_file}.{os.getpid()}.tmp"
+		writer = BinaryWriter if file_format == "binary" else AttributeWriter
+		self.writer = writer(self.temp_file, header, encoder, codec, level, threads)
+
+	@property
+	def hashed(self):
+		return self.cache is not None
+
+	def add_frame(self, frame, geo_hash, capture):
+		"""Write the next frame, capture is only called if the frame isn't cached"""
+		if self.cache is None:
+			self.writer.write_frame(frame, capture())
+			return
+
+		# Splice in the line from the last export if nothing it depends on has changed
+		cache = self.cache
+		ref = self.writer.encoder.next_ref()
+		key = cache.key({"none": "", "base": self.base_hash, "prev": self.prev_key}[ref], geo_hash)
+		if cache.has(frame, key, "line") and cache.has(frame, geo_hash, "pkl"):
+			self.writer.write_encoded(cache.read(frame, key, "line"), lambda: cache.read_capture(frame, geo_hash))
+		else:
+			frame_data = capture()
+			cache.write_capture(frame, geo_hash, frame_data)
+			cache.write(frame, key, "line", self.writer.write_frame(frame, frame_data))
+
+		if ref == "none":
+			self.base_hash = geo_hash
+		self.prev_key = key
+
+	def finish(self):
+		self.writer.close()
+		os.replace(self.temp_file, self.out_file)
+
+		# Frames spliced from the cache aren't measured again
+		if self.writer.encoder.errors:
+			errors = ", ".join(f"{name} {error:.3g}" for (cls, name), error in self.writer.encoder.errors.items())
+			message = f"Max quantization error in {self.out_file}: {errors}"
+			if hou.isUIAvailable():
+				hou.ui.setStatusMessage(message)
+			print(message)
+
+	def abort(self):
+		self.writer.close()
+		if os.path.exists(self.temp_file):
+			os.remove(self.temp_file)
+
+def run_job(job):
+	try:
+		with hou.InterruptableOperation("Cooking frames", long_operation_name="Exporting attributes", open_interrupt_dialog=True) as operation:
+			cooked = cook_frames(job.node, job.frames, job.spec, job.workers, job.hashed,
+				progress=lambda fraction: operation.updateLongProgress(fraction, "Cooking frames in workers"))
+			for i, (frame, geo_hash, capture) in enumerate(cooked):
+				# Raises hou.OperationInterrupted if the user cancels
+				operation.updateLongProgress(i / len(job.frames), f"Frame {frame}")
+				job.add_frame(frame, geo_hash, capture)
+	except BaseException:
+		job.abort()
+		raise
+	job.finish()
+
+# SHARDS
+
+# With sharding, out_file holds a manifest listing the shard files written next to it
+MANIFEST_FORMAT = "houdini_attributes_manifest"
+
+def shard_frames(node):
+	"""Split the frame range into shards of shard_size frames"""
+	frames = frame_range(node)
+	size = int(parm_value(node, "shard_size", 0))
+	return [frames[i:i + size] for i in range(0, len(frames), size)]
+
+def shard_file(out_file, frames):
+	"""Shards are named after the output file with their frame range before the extension"""
+	folder, name = os.path.split(out_file)
+	stem, dot, ext = name.partition(".")
+	return os.path.join(folder, f"{stem}.{frames[0]}-{frames[-1]}{dot}{ext}")
+
+def write_manifest(node, schema, out_file=None):
+	"""Write the manifest, every shard writes the same one so farm tasks can finish in any order"""
+	out_file = out_file or str(node.parm("out_file").eval())
+	frames = frame_range(node)
+	manifest = {
+		"format": MANIFEST_FORMAT,
+		"version": VERSION,
+		"frames": [frames[0], frames[-1]],
+		"schema": schema,
+		"shards": [{"file": os.path.basename(shard_file(out_file, block)), "frames": [block[0], block[-1]]} for block in shard_frames(node)]
+	}
+	temp_file = f"{out_file}.{os.getpid()}.tmp"
+	with open(temp_file, "w") as manifest_file:
+		json.dump(manifest, manifest_file)
+	os.replace(temp_file, out_file)
+
+def export_shard(node, index):
+	"""Export a single shard, meant to be called by farm tasks with hou.node(path).hdaModule().export_shard(node, index)"""
+	out_file = str(node.parm("out_file").eval())
+	block = shard_frames(node)[index]
+	job = ExportJob(node, shard_file(out_file, block), block)
+	run_job(job)
+	write_manifest(node, job.schema)
+
+def export(kwargs):
+	node = kwargs['node']
+	if int(parm_value(node, "shard_size", 0)) <= 0:
+		run_job(ExportJob(node))
+		return
+
+	# Export every shard locally, farms can call export_shard() for each one instead
+	for index in range(len(shard_frames(node))):
+		export_shard(node, index)
+
+def export_batch(nodes, out_files=None):
+	"""Export many nodes in one pass through time, so networks they share are only cooked once per frame.
+
+	Each node keeps its own frame range and settings, out_files optionally overrides where each one is written.
+	Sharded nodes get a job per shard, and their manifest is written once every shard is done.
+	"""
+	jobs = []
+	manifests = []
+	try:
+		for i, node in enumerate(nodes):
+			out_file = out_files[i] if out_files else str(node.parm("out_file").eval())
+			if int(parm_value(node, "shard_size", 0)) <= 0:
+				jobs.append(ExportJob(node, out_file))
+				continue
+			shard_jobs = [ExportJob(node, shard_file(out_file, block), block) for block in shard_frames(node)]
+			jobs += shard_jobs
+			manifests.append((node, shard_jobs[0], out_file))
+		frames = sorted(set(frame for job in jobs for frame in job.frames))
+		start_frame = hou.frame()
+		with hou.InterruptableOperation("Cooking frames", long_operation_name="Exporting attributes", open_interrupt_dialog=True) as operation:
+			try:
+				for i, frame in enumerate(frames):
+					operation.updateLongProgress(i / len(frames), f"Frame {frame}")
+					# Moving the playhead once cooks shared upstream nodes once for every export
+					hou.setFrame(frame)
+					for job in jobs:
+						if frame not in job.frames:
+							continue
+						geo = job.node.inputGeometry(0)
+						geo_hash = geometry_hash(geo) if job.hashed else None
+						job.add_frame(frame, geo_hash, lambda: capture_frame(geo, job.spec))
+			finally:
+				hou.setFrame(start_frame)
+	except BaseException:
+		for job in jobs:
+			job.abort()
+		raise
+	for job in jobs:
+		job.finish()
+	for node, job, out_file in manifests:
+		write_manifest(node, job.schema, out_file)
+
+def export_all(kwargs):
+	"""Export every Blender JSON Export node in the scene in one pass"""
+	export_batch(kwargs['node'].type().instances())
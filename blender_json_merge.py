@@ -0,0 +1,102 @@
+"""Merge the shards of a Blender JSON Export into a single file.
+
+Usage: python blender_json_merge.py <manifest> [<output>]
+
+The output defaults to the manifest itself, so it's replaced by the merged file and imports keep the same path.
+Shards are copied without being decompressed, each one starts with a full frame so they can simply follow each other.
+Readers take the latest full frame as the base of the keyframes after it.
+"""
+import json, gzip, lzma, os, sys, zlib
+
+MANIFEST_FORMAT = "houdini_attributes_manifest"
+
+CODECS = {
+	"none": lambda data: data,
+	"gzip": lambda data: gzip.compress(data, mtime=0),
+	"zlib": lambda data: zlib.compress(data),
+	"lzma": lambda data: lzma.compress(data)
+}
+
+def detect_codec(start: bytes) -> str:
+	if start.startswith(b"\x1f\x8b"):
+		return "gzip"
+	if start.startswith(b"\xfd7zXZ\x00"):
+		return "lzma"
+	if start.startswith(b"\x78"):
+		return "zlib"
+	return "none"
+
+def new_decompressor(codec: str):
+	match codec:
+		case "gzip":
+			return zlib.decompressobj(wbits=31)
+		case "zlib":
+			return zlib.decompressobj()
+		case "lzma":
+			return lzma.LZMADecompressor()
+
+def read_header(file, block_size: int = 1 << 16) -> tuple[dict, str, bytes]:
+	"""Read the header of a shard, returning it with the codec and any bytes read past it"""
+	data = file.read(block_size)
+	if data.startswith(b"HATTRBIN"):
+		raise Exception("Binary shards can't be merged, export them in the JSON format")
+	codec = detect_codec(data)
+	if codec == "none":
+		while b"\n" not in data:
+			more = file.read(block_size)
+			if not more:
+				raise Exception("Shard ends before its header")
+			data += more
+		end = data.index(b"\n") + 1
+		return json.loads(data[:end]), codec, data[end:]
+
+	# The header is compressed as its own stream, the frames start where it ends
+	decompressor = new_decompressor(codec)
+	header = b""
+	while not decompressor.eof:
+		if not data:
+			raise Exception("Shard ends before its header")
+		header += decompressor.decompress(data)
+		data = b"" if decompressor.eof else file.read(block_size)
+	return json.loads(header), codec, decompressor.unused_data
+
+def schema_types(schema: dict) -> dict:
+	# Element counts can change between shards, types can't
+	return {cls: {name: (entry["storage"], entry["size"], entry["array"]) for name, entry in attribs.items()} for cls, attribs in schema.items()}
+
+def merge(manifest_path: str, out_path: str | None = None) -> None:
+	with open(manifest_path) as manifest_file:
+		manifest = json.load(manifest_file)
+	if manifest.get("format") != MANIFEST_FORMAT:
+		raise Exception(f"{manifest_path} is not a shard manifest")
+
+	folder = os.path.dirname(manifest_path)
+	shards = sorted(manifest["shards"], key=lambda shard: shard["frames"][0])
+	out_path = out_path or manifest_path
+	temp_path = f"{out_path}.{os.getpid()}.tmp"
+	try:
+		with open(temp_path, "wb") as out:
+			first = None
+			for shard in shards:
+				with open(os.path.join(folder, shard["file"]), "rb") as shard_file:
+					header, codec, rest = read_header(shard_file)
+					if first is None:
+						first = (header, codec)
+						merged = {**header, "frames": manifest["frames"]}
+						out.write(CODECS[codec]((json.dumps(merged) + "\n").encode("utf-8")))
+					elif codec != first[1] or schema_types(header["schema"]) != schema_types(first[0]["schema"]):
+						raise Exception(f"Shard {shard['file']} was exported with different settings")
+					out.write(rest)
+					while block := shard_file.read(1 << 20):
+						out.write(block)
+		os.replace(temp_path, out_path)
+	except BaseException:
+		if os.path.exists(temp_path):
+			os.remove(temp_path)
+		raise
+
+if __name__ == "__main__":
+	if len(sys.argv) not in (2, 3):
+		print(__doc__)
+		sys.exit(1)
+	merge(*sys.argv[1:])
@@ -1,4 +1,7 @@
-import bpy, os, json, gzip
+import bpy, os, re, json, base64, bisect, hashlib, lzma, mmap, struct, tempfile, threading, time, zipfile, zlib
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from bpy_extras.io_utils import ImportHelper
 
@@ -42,6 +45,9 @@ def auto_import(filepath: str) -> str:
 		case _:
 			raise Exception(f"Unsupported file extension '{extension}'")
 
+# Extensions auto_import can read
+GEOMETRY_EXTENSIONS = ("abc", "dae", "obj", "stl", "usd", "fbx", "x3d", "wrl", "gltf", "ply", "svg")
+
 def unlink_everywhere(obj, col):
 	"""Unlink an object from all subcollections"""
 	try:
@@ -51,45 +57,1231 @@ def unlink_everywhere(obj, col):
 	for child in col.children:
 		unlink_everywhere(obj, child)
 
-def infer_type(name: str, data: Any) -> str:
-	if isinstance(data, int):
-		return "INT"
-	elif isinstance(data, bool):
+# Houdini storage types read into typed arrays, everything else stays as Python values
+STORAGE_DTYPES = {"Float": np.float32, "Int": np.int32}
+
+def infer_schema(name: str, sample: Any, count: int) -> dict:
+	"""Guess an attribute's schema from a sample value, only needed for exports without one"""
+	size = len(sample) if isinstance(sample, (list, tuple)) else 1
+	first = sample[0] if isinstance(sample, (list, tuple)) and sample else sample
+	return {
+		"storage": {bool: "Int", int: "Int", float: "Float", str: "String"}.get(type(first), "Dict"),
+		"size": size,
+		"array": False,
+		"qualifier": "Color" if name == "Cd" or "color" in name else "",
+		"count": count
+	}
+
+def blender_type(entry: dict) -> str | None:
+	"""Blender attribute type for a schema entry, or None if Blender can't store it"""
+	if entry["storage"] == "Group":
 		return "BOOLEAN"
-	elif isinstance(data, float):
-		return "FLOAT"
-	elif isinstance(data, str):
-		return "STRING"
-	elif isinstance(data, (list, tuple)):
-		if len(data) == 2:
+	if entry["array"] or entry["storage"] not in ("Float", "Int", "String"):
+		return None
+	if entry["storage"] == "String":
+		return "STRING" if entry["size"] == 1 else None
+	if entry["storage"] == "Int" and entry["size"] == 1:
+		return "INT"
+	match entry["size"]:
+		case 1:
+			return "FLOAT"
+		case 2:
 			return "FLOAT2"
-		elif name == "Cd" or "color" in name:
-			return "COLOR"
-		else:
+		case 3 | 4 if entry["qualifier"] == "Color":
+			return "FLOAT_COLOR"
+		case 3:
 			return "FLOAT_VECTOR"
-	else:
-		return "STRING"
+		case _:
+			return None
+
+def to_array(entry: dict, value: Any) -> Any:
+	"""Convert a frame's values to a typed array in one go, strings, dicts and arrays are left as they are"""
+	dtype = STORAGE_DTYPES.get(entry["storage"])
+	if dtype is None or entry["array"] or value is None:
+		return value
+	array = np.asarray(value, dtype=dtype)
+	return array.reshape(-1, entry["size"]) if entry["size"] > 1 else array
+
+def octahedral_decode(packed: np.ndarray) -> np.ndarray:
+	xy = packed.astype(np.float64) / 32767
+	z = 1 - np.abs(xy).sum(axis=1)
+	fold = np.clip(-z, 0, None)[:, None]
+	xy -= np.where(xy >= 0, 1, -1) * fold
+	vectors = np.column_stack((xy, z))
+	return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+def dequantize(payload: dict) -> np.ndarray:
+	"""Turn a quantized payload back into float values for the whole array at once"""
+	values = np.asarray(payload["value"])
+	match payload["q"]:
+		case "half":
+			return values.astype(np.uint16).view(np.float16).astype(np.float32)
+		case "fixed":
+			low, high = (np.asarray(bound, dtype=np.float64) for bound in payload["range"])
+			return ((values + 32768.0) * ((high - low) / 65535) + low).astype(np.float32)
+		case "oct":
+			return octahedral_decode(values.reshape(-1, 2))
+		case _:
+			raise Exception(f"Unsupported quantization '{payload['q']}'")
+
+def decode_group(payload: dict) -> np.ndarray:
+	"""Unpack a group stored as a bitset or ranges of members into a boolean mask"""
+	if "bits" in payload:
+		packed = np.frombuffer(base64.b64decode(payload["bits"]), dtype=np.uint8)
+		return np.unpackbits(packed, count=payload["count"]).astype(bool)
+	# Each member adds one at the start of its run and takes one away after the end
+	steps = np.zeros(payload["count"] + 1, dtype=np.int8)
+	steps[payload["ranges"][0::2]] += 1
+	steps[payload["ranges"][1::2]] -= 1
+	return np.cumsum(steps[:-1]).astype(bool)
+
+def payload_values(entry: dict, payload: dict) -> Any:
+	return dequantize(payload) if "q" in payload else to_array(entry, payload["value"])
+
+class IndexedStrings:
+	"""String values stored as a table of unique strings and an index per element.
+
+	Each unique string only exists once in memory no matter how many elements use it.
+	"""
+	__slots__ = ("strings", "ids")
+
+	def __init__(self, strings: list[str], ids: np.ndarray):
+		self.strings = strings
+		self.ids = ids
+
+	def __len__(self) -> int:
+		return len(self.ids)
+
+	def __getitem__(self, i: int) -> str:
+		return self.strings[self.ids[i]]
+
+	def __iter__(self):
+		strings = self.strings
+		return (strings[i] for i in self.ids.tolist())
+
+	def __eq__(self, other: Any) -> bool:
+		return isinstance(other, IndexedStrings) and self.strings == other.strings and np.array_equal(self.ids, other.ids)
+
+def decode_strings(payload: dict, old: IndexedStrings | None) -> IndexedStrings:
+	# The table is only stored when it changes
+	strings = payload["strings"] if "strings" in payload else old.strings
+	ids = np.asarray(payload["value"], dtype=np.int32)
+	if "index" in payload:
+		patched = old.ids.copy()
+		patched[payload["index"]] = ids
+		ids = patched
+	return IndexedStrings(strings, ids)
+
+def same_value(a: Any, b: Any) -> bool:
+	if a is b:
+		return True
+	if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+		return isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and np.array_equal(a, b)
+	return a == b
+
+def key_at(keys: list, frame: int) -> Any:
+	"""Value of the last key on or before a frame"""
+	value = keys[0][1]
+	for key_frame, key_value in keys:
+		if key_frame > frame:
+			break
+		value = key_value
+	return value
+
+# Property, type and width of the values of each Blender attribute type, for foreach_set
+DATA_BUFFERS = {
+	"FLOAT": ("value", np.float32, 1),
+	"INT": ("value", np.int32, 1),
+	"FLOAT2": ("vector", np.float32, 2),
+	"FLOAT_VECTOR": ("vector", np.float32, 3),
+	"FLOAT_COLOR": ("color", np.float32, 4),
+	"BOOLEAN": ("value", bool, 1)
+}
+
+def scatter_values(buffer: np.ndarray, values: np.ndarray, index: np.ndarray | None = None) -> None:
+	"""Write a frame's values into a buffer holding a row for every element of the attribute.
+
+	With an index the values are scattered into those elements, elements with a negative index are skipped.
+	Elements that aren't written keep their values from the previous frame.
+	"""
+	values = np.asarray(values, dtype=buffer.dtype).reshape(-1, buffer.shape[1])
+	if index is None and len(values) == len(buffer):
+		buffer[:] = values
+		return
+	if index is None:
+		index = np.arange(min(len(values), len(buffer)))
+	found = (index >= 0) & (index < len(buffer))
+	buffer[index[found]] = values[:len(index)][found]
+
+def get_action(id_data: bpy.types.ID) -> bpy.types.Action:
+	"""The action animating a datablock, made if it doesn't have one yet"""
+	anim = id_data.animation_data or id_data.animation_data_create()
+	if anim.action is None:
+		anim.action = bpy.data.actions.new(name=f"{id_data.name}Action")
+	return anim.action
+
+def add_fcurve(action: bpy.types.Action, data_path: str, index: int, frames: list, values: np.ndarray, interpolation: str) -> None:
+	"""Make an F-curve with all of its keyframes at once, instead of inserting them one by one"""
+	old = action.fcurves.find(data_path, index=index)
+	if old is not None:
+		action.fcurves.remove(old)
+	curve = action.fcurves.new(data_path, index=index)
+	points = curve.keyframe_points
+	points.add(len(frames))
+	co = np.empty((len(frames), 2), dtype=np.float32)
+	co[:, 0] = frames
+	co[:, 1] = values
+	points.foreach_set("co", co.ravel())
+	mode = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items[interpolation].value
+	points.foreach_set("interpolation", np.full(len(frames), mode, dtype=np.int32))
+	curve.update()
+
+def animate_elements(action: bpy.types.Action, data_path: str, prop: str, frames: list, samples: np.ndarray, interpolation: str):
+	"""Add F-curves for each element and component of an attribute that changes, samples holds the values of every key.
+
+	Yields after each F-curve, so imports running in the background can spread the work over several updates.
+	"""
+	varying = (samples != samples[0]).any(axis=0)
+	for i, component in zip(*np.nonzero(varying)):
+		add_fcurve(action, f"{data_path}.data[{i}].{prop}", int(component), frames, samples[:, i, component], interpolation)
+		yield
+
+def corner_order(mesh: bpy.types.Mesh, points: np.ndarray, prims: np.ndarray) -> np.ndarray:
+	"""Blender loop of each Houdini vertex, matched through point and prim numbers as the winding can differ.
+
+	Vertices without a matching loop get -1.
+	"""
+	loop_points = np.empty(len(mesh.loops), dtype=np.int64)
+	mesh.loops.foreach_get("vertex_index", loop_points)
+	loop_totals = np.empty(len(mesh.polygons), dtype=np.int64)
+	mesh.polygons.foreach_get("loop_total", loop_totals)
+	loop_prims = np.repeat(np.arange(len(mesh.polygons)), loop_totals)
+
+	stride = max(len(mesh.vertices), int(points.max(initial=0)) + 1)
+	blender_keys = loop_prims * stride + loop_points
+	houdini_keys = prims.astype(np.int64) * stride + points
+	order = np.argsort(blender_keys)
+	if len(order) == 0:
+		return np.full(len(points), -1, dtype=np.int64)
+	loops = order[np.searchsorted(blender_keys, houdini_keys, sorter=order).clip(max=len(order) - 1)]
+	loops[blender_keys[loops] != houdini_keys] = -1
+	return loops
+
+def id_keys(obj: bpy.types.Object, ids: list) -> list:
+	"""Blender point of each exported point on every frame the ids were keyed, matched by id.
+
+	Points are matched against the mesh's own id attribute if it has one, otherwise the first frame's ids.
+	Exported points missing from the mesh get -1.
+	"""
+	mesh_ids = ids[0][1]
+	attr = obj.data.attributes.get("id")
+	if attr is not None and attr.domain == "POINT" and attr.data_type == "INT":
+		mesh_ids = np.empty(len(attr.data), dtype=np.int32)
+		attr.data.foreach_get("value", mesh_ids)
+	# Sorting once makes matching each frame a binary search instead of a dict lookup per point
+	order = np.argsort(mesh_ids, kind="stable")
+	sorted_ids = mesh_ids[order]
+	keys = []
+	for frame, frame_ids in ids:
+		if len(order) == 0:
+			keys.append((frame, np.full(len(frame_ids), -1)))
+			continue
+		found = np.searchsorted(sorted_ids, frame_ids).clip(max=len(order) - 1)
+		points = order[found]
+		points[sorted_ids[found] != frame_ids] = -1
+		keys.append((frame, points))
+	return keys
+
+def corner_keys(mesh: bpy.types.Mesh, topology: dict[str, list]) -> list:
+	"""Blender loops of the Houdini vertices on every frame the topology was keyed"""
+	frames = sorted({frame for keys in topology.values() for frame, _ in keys})
+	return [(frame, corner_order(mesh, key_at(topology["point"], frame), key_at(topology["prim"], frame))) for frame in frames]
+
+def transfer_attributes(attributes: dict[str, list], schema: dict, domain: str, obj: bpy.types.Object, index_keys: list | None = None, written: dict | None = None):
+	"""Set and key attributes on the object's data, index_keys holds the element numbers written on each frame if filtered.
+
+	Yields the name of each attribute once it's written, and nothing in between while it's being keyed.
+	If given, written holds the strings last written to each attribute, which aren't written again while they're the same.
+	"""
+	for attr, keys in attributes.items():
+		attr_type = blender_type(schema[attr])
+		if attr_type is None:
+			continue
+		# Houdini UVs have a third component, Blender's UV maps only have two
+		uv = domain == "CORNER" and attr.startswith("uv") and attr_type == "FLOAT_VECTOR"
+		if uv:
+			attr_type = "FLOAT2"
+		# Live playback writes into the same attribute on every frame
+		anim_attr = obj.data.attributes.get(attr)
+		created = anim_attr is None or anim_attr.data_type != attr_type or anim_attr.domain != domain
+		if created:
+			if anim_attr is not None:
+				obj.data.attributes.remove(anim_attr)
+			anim_attr = obj.data.attributes.new(name=attr, type=attr_type, domain=domain)
+
+		# Strings have no foreach access, they're set one by one and can't be animated in Blender
+		if attr_type == "STRING":
+			frame, frame_data = keys[0]
+			index = None if index_keys is None else key_at(index_keys, frame)
+			last = None if written is None or created else written.get((domain, attr))
+			if last is None or not same_value(last[0], frame_data) or not same_value(last[1], index):
+				for i, value in zip(range(len(frame_data)) if index is None else index.tolist(), frame_data):
+					if 0 <= i < len(anim_attr.data):
+						anim_attr.data[i].value = value
+				if written is not None:
+					# Copied as the ids and index can be views of a mapped file
+					if isinstance(frame_data, IndexedStrings):
+						frame_data = IndexedStrings(frame_data.strings, frame_data.ids.copy())
+					written[domain, attr] = (frame_data, None if index is None else index.copy())
+			yield attr
+			continue
+
+		# One buffer is carried through every frame of the attribute, new attributes start zeroed
+		prop, dtype, width = DATA_BUFFERS[attr_type]
+		buffer = np.zeros((len(anim_attr.data), width), dtype=dtype)
+		frames = []
+		samples = []
+		for frame, frame_data in keys:
+			if frame_data is None:
+				continue
+			# Blender colors always have alpha
+			if attr_type == "FLOAT_COLOR" and schema[attr]["size"] == 3:
+				frame_data = np.hstack((frame_data, np.ones((len(frame_data), 1), dtype=np.float32)))
+			if uv:
+				frame_data = frame_data[:, :2]
+			scatter_values(buffer, frame_data, None if index_keys is None else key_at(index_keys, frame))
+			frames.append(frame)
+			samples.append(buffer.copy())
+		if samples:
+			anim_attr.data.foreach_set(prop, samples[0].ravel())
+
+		# Constant attributes don't need keyframes, ints and booleans hold their value between keys
+		if len(samples) > 1:
+			interpolation = "CONSTANT" if attr_type in ("INT", "BOOLEAN") else "LINEAR"
+			yield from animate_elements(get_action(obj.data), f"attributes[\"{attr}\"]", prop, frames, np.stack(samples), interpolation)
+		yield attr
+
+def add_vertex_groups(obj: bpy.types.Object, groups: dict[str, list], index_keys: list | None = None):
+	"""Add point groups as vertex groups, which can't be animated so only the first frame is used"""
+	for name, keys in groups.items():
+		frame, mask = keys[0]
+		if mask is None:
+			continue
+		members = np.flatnonzero(mask) if index_keys is None else key_at(index_keys, frame)[mask]
+		members = members[members >= 0]
+		obj.vertex_groups.new(name=name).add(members.tolist(), 1.0, "REPLACE")
+		yield name
+
+# Must match the formats written by blender_json_export.py
+ATTRIB_FORMAT = "houdini_attributes"
+MANIFEST_FORMAT = "houdini_attributes_manifest"
+BINARY_FORMAT = "houdini_attributes_binary"
+BINARY_MAGIC = b"HATTRBIN"
+BINARY_HEADER = struct.Struct("<8sIIQQ")
+
+def detect_codec(start: bytes) -> str:
+	"""Find the codec of an attribute file from its first bytes"""
+	if start.startswith(b"\x1f\x8b"):
+		return "gzip"
+	if start.startswith(b"\xfd7zXZ\x00"):
+		return "lzma"
+	if start.startswith(b"\x78"):
+		return "zlib"
+	return "none"
+
+def new_decompressor(codec: str):
+	match codec:
+		case "gzip":
+			return zlib.decompressobj(wbits=31)
+		case "zlib":
+			return zlib.decompressobj()
+		case "lzma":
+			return lzma.LZMADecompressor()
+		case _:
+			raise Exception(f"Unsupported codec '{codec}'")
+
+def iter_decompressed(filepath: str, block_size: int = 1 << 20, start: int = 0):
+	"""Yield decompressed blocks of a file made of one or more independently compressed chunks, reading from start.
+
+	Each block comes with the offset reading can restart from to get it again, which is the start of its chunk,
+	or the start of the block itself for uncompressed files.
+	"""
+	with open(filepath, "rb") as file:
+		file.seek(start)
+		data = file.read(block_size)
+		codec = detect_codec(data)
+		offset = start
+		if codec == "none":
+			while data:
+				yield offset, data
+				offset += len(data)
+				data = file.read(block_size)
+			return
+
+		decompressor = new_decompressor(codec)
+		while data:
+			yield offset, decompressor.decompress(data)
+			# Each chunk is a separate stream, so a new decompressor picks up where the last one ended
+			if decompressor.eof:
+				offset = file.tell() - len(decompressor.unused_data)
+				data = decompressor.unused_data or file.read(block_size)
+				decompressor = new_decompressor(codec)
+			else:
+				data = file.read(block_size)
+
+def read_lines(filepath: str, start: int = 0):
+	"""Yield each line of an attribute file undecoded as soon as it's decompressed, with an offset reading can restart from.
+
+	Lines of a compressed chunk share the chunk's offset, so restarting there can give earlier lines first.
+	"""
+	with open(filepath, "rb") as file:
+		file.seek(start)
+		exact = detect_codec(file.read(6)) == "none"
+	pieces = []
+	line_offset = start
+	for offset, block in iter_decompressed(filepath, start=start):
+		begin = 0
+		if not any(pieces):
+			line_offset = offset
+		while (end := block.find(b"\n", begin)) != -1:
+			pieces.append(block[begin:end])
+			line = b"".join(pieces)
+			pieces = []
+			if line.strip():
+				yield line_offset, line
+			begin = end + 1
+			line_offset = offset + begin if exact else offset
+		pieces.append(block[begin:])
+	line = b"".join(pieces)
+	if line.strip():
+		yield line_offset, line
+
+def read_records(filepath: str, start: int = 0):
+	"""Yield each record of an attribute file as soon as it's decompressed, with an offset like read_lines"""
+	lines = read_lines(filepath, start)
+	try:
+		for offset, line in lines:
+			yield offset, json.loads(line)
+	finally:
+		lines.close()
+
+# The exporter writes the time and reference first, so they can be found without decoding the payloads
+RECORD_START = re.compile(rb'\s*\{"frame": ([^,]+), "ref": "(\w+)"')
+
+def record_key(line: bytes) -> tuple[float, str]:
+	"""Time and reference of a record line"""
+	if (match := RECORD_START.match(line)) is not None:
+		return json.loads(match[1]), match[2].decode()
+	record = json.loads(line)
+	return record["frame"], record.get("ref", "none")
+
+def read_attribute_file(filepath: str):
+	"""Yield each line of an attribute file as soon as it's decompressed"""
+	for _, record in read_records(filepath):
+		yield record
+
+def decode_record(record: dict, base: dict, prev: dict, schema: dict) -> dict:
+	"""Rebuild the full state of a frame from a record stored relative to an earlier frame"""
+	reference = {"none": {}, "base": base, "prev": prev}[record.get("ref", "none")]
+	state = {}
+	for cls, entries in schema.items():
+		# Attributes missing from the record are unchanged, so they share the reference's data
+		state[cls] = dict(reference.get(cls, {}))
+		for name, payload in record.get(cls, {}).items():
+			entry = entries[name]
+			if "bits" in payload or "ranges" in payload:
+				state[cls][name] = decode_group(payload)
+			elif "strings" in payload or isinstance(state[cls].get(name), IndexedStrings):
+				state[cls][name] = decode_strings(payload, state[cls].get(name))
+			elif "index" not in payload:
+				state[cls][name] = payload["value"] if cls == "detail" else payload_values(entry, payload)
+			elif isinstance(state[cls][name], np.ndarray):
+				values = state[cls][name].copy()
+				values[payload["index"]] = payload_values(entry, payload)
+				state[cls][name] = values
+			else:
+				values = list(state[cls][name])
+				for i, value in zip(payload["index"], payload["value"]):
+					values[i] = value
+				state[cls][name] = values
+	return state
+
+# Older exports are a single JSON document of classes, attributes and a list of values per frame
+LEGACY_START = re.compile(rb'\s*\{\s*(?:\}|"(?:detail|prim|point|vertex)")')
+LEGACY_TOKEN = re.compile(rb'\s*(?:[\[\]{},:]|"(?:[^"\\]|\\.)*"|[^\s\[\]{},:"]+)')
+# Skips everything up to the next bracket or string, including whole arrays of numbers like vectors
+LEGACY_SKIP = re.compile(rb'(?:[^\[\]{}"]|\[[^\[\]{}"]*\])*')
+LEGACY_STRING_END = re.compile(rb'(?:[^"\\]|\\.)*"')
+LEGACY_SPACE = re.compile(rb'\s*')
+
+def is_legacy(filepath: str) -> bool:
+	blocks = iter_decompressed(filepath, 1 << 12)
+	start = b""
+	try:
+		for _, block in blocks:
+			start += block
+			if len(start) >= 16:
+				break
+	finally:
+		blocks.close()
+	return LEGACY_START.match(start) is not None
+
+class LegacyReader:
+	"""Walks the decompressed stream of an older export, only buffering the value being read"""
+	def __init__(self, filepath: str):
+		self.blocks = iter_decompressed(filepath)
+		self.data = bytearray()
+		self.pos = 0
+
+	def more(self) -> bool:
+		"""Append the next block to the buffer, dropping everything already read"""
+		block = next(self.blocks, None)
+		if block is None:
+			return False
+		del self.data[:self.pos]
+		self.pos = 0
+		self.data += block[1]
+		return True
+
+	def peek(self) -> bytes:
+		while (end := LEGACY_SPACE.match(self.data, self.pos).end()) == len(self.data) and self.more():
+			pass
+		return bytes(self.data[end:end + 1])
+
+	def token(self) -> bytes:
+		"""Next bracket, separator, string or literal"""
+		while True:
+			match = LEGACY_TOKEN.match(self.data, self.pos)
+			# Tokens running into the end of the buffer can continue in the next block
+			if (match and match.end() < len(self.data)) or not self.more():
+				break
+		if match is None:
+			raise Exception("Attribute file ends unexpectedly")
+		self.pos = match.end()
+		return match.group().strip()
+
+	def expect(self, expected: bytes) -> None:
+		if (token := self.token()) != expected:
+			raise Exception(f"Expected {expected.decode()} in attribute file, found {token[:32].decode()}")
+
+	def value(self) -> bytes:
+		"""Raw JSON of the next value"""
+		token = self.token()
+		if token not in (b"[", b"{"):
+			return token
+		# Keep the value in the buffer while finding where its brackets close
+		self.pos -= 1
+		scan = self.pos + 1
+		depth = 1
+		while depth:
+			scan = LEGACY_SKIP.match(self.data, scan).end()
+			end = None
+			if scan < len(self.data) and self.data[scan] == ord('"'):
+				end = (match := LEGACY_STRING_END.match(self.data, scan + 1)) and match.end()
+			elif scan < len(self.data):
+				end = scan + 1
+				depth += 1 if self.data[scan] in b"[{" else -1
+			if end is None:
+				scan -= self.pos
+				if not self.more():
+					raise Exception("Attribute file ends unexpectedly")
+				continue
+			scan = end
+		value = bytes(self.data[self.pos:scan])
+		self.pos = scan
+		return value
+
+def iter_legacy(filepath: str):
+	"""Yield the class, name, frame number and raw JSON of every value in an older export, one at a time"""
+	reader = LegacyReader(filepath)
+	reader.expect(b"{")
+	cls_token = reader.token()
+	while cls_token != b"}":
+		cls = json.loads(cls_token)
+		reader.expect(b":")
+		reader.expect(b"{")
+		name_token = reader.token()
+		while name_token != b"}":
+			name = json.loads(name_token)
+			reader.expect(b":")
+			reader.expect(b"[")
+			# Older exports don't store sample times and always started on frame 1
+			frame = 1
+			while reader.peek() != b"]":
+				yield cls, name, frame, reader.value()
+				frame += 1
+				if reader.peek() == b",":
+					reader.token()
+			reader.expect(b"]")
+			if (name_token := reader.token()) == b",":
+				name_token = reader.token()
+		if (cls_token := reader.token()) == b",":
+			cls_token = reader.token()
+
+def load_legacy(filepath: str, progress=None) -> tuple[dict, dict, int]:
+	"""Stream an older export into a guessed schema and keys like load_attributes makes, with its frame count.
+
+	Values are only parsed when their JSON differs from the frame before, and attributes Blender can't hold only
+	have their first frame parsed, so memory stays around the size of the keys.
+	"""
+	# Every class gets a key even when the export has no attributes for it, like load_attributes
+	schema = {cls: {} for cls in ("detail", "prim", "point", "vertex")}
+	data = {cls: {} for cls in ("detail", "prim", "point", "vertex")}
+	frame_count = 0
+	last = None
+	for cls, name, frame, raw in iter_legacy(filepath):
+		frame_count = max(frame_count, frame)
+		if progress:
+			progress(frame)
+		if frame == 1:
+			sample = json.loads(raw)
+			entry = infer_schema(name, sample if cls == "detail" else (sample[0] if sample else None), 1 if cls == "detail" else len(sample or []))
+			schema.setdefault(cls, {})[name] = entry
+			data.setdefault(cls, {})[name] = [(frame, sample if cls == "detail" else to_array(entry, sample))]
+			last = raw
+			continue
+		entry = schema[cls][name]
+		keys = data[cls][name]
+		if raw == last or (cls != "detail" and blender_type(entry) is None):
+			continue
+		last = raw
+		value = json.loads(raw)
+		if cls != "detail":
+			value = to_array(entry, value)
+		if same_value(value, keys[-1][1]):
+			continue
+		# Hold the previous value until the frame before the change
+		if keys[-1][0] != frame - 1:
+			keys.append((frame - 1, keys[-1][1]))
+		keys.append((frame, value))
+	return schema, data, frame_count
+
+def legacy_frames(data: dict, frame_count: int):
+	for frame in range(1, frame_count + 1):
+		yield frame, {cls: {name: key_at(keys, frame) for name, keys in attribs.items()} for cls, attribs in data.items()}
+
+def stream_frames(records, schema: dict):
+	base = prev = None
+	for record in records:
+		state = decode_record(record, base, prev, schema)
+		# Merged files have a full frame at the start of each shard, later keyframes refer to the latest one
+		if record.get("ref", "none") == "none":
+			base = state
+		prev = state
+		yield record["frame"], state
+
+def shard_frames(filepath: str, manifest: dict):
+	"""Yield the frames of each shard listed in a manifest in order"""
+	folder = os.path.dirname(filepath)
+	for shard in sorted(manifest["shards"], key=lambda shard: shard["frames"][0]):
+		_, frames = open_frames(os.path.join(folder, shard["file"]))
+		yield from frames
+
+class AttributeArchive:
+	"""Memory maps a binary attribute file, so any sample's attributes can be read without touching the rest.
+
+	Uncompressed arrays are returned as read-only views of the mapped file, nothing is copied until they're written
+	to Blender. The index at the end of the file lists every sample's payloads, attributes missing from a sample are
+	found by following its reference back to the sample that stored them.
+	"""
+	def __init__(self, filepath: str):
+		with open(filepath, "rb") as file:
+			self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, _, _, offset, length = BINARY_HEADER.unpack_from(self.map, 0)
+		if magic != BINARY_MAGIC:
+			raise Exception(f"{filepath} is not a binary attribute file")
+		self.index = json.loads(self.map[offset:offset + length])
+		self.schema = self.index["schema"]
+		self.codec = self.index["codec"]
+		self.samples = self.index["samples"]
+		self.times = [sample["frame"] for sample in self.samples]
+
+	def close(self) -> None:
+		"""Unmap the file, arrays read from it must be gone first"""
+		self.map.close()
+
+	def block(self, block: list) -> np.ndarray:
+		offset, length, dtype, shape = block
+		if self.codec == "none":
+			return np.frombuffer(self.map, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+		data = new_decompressor(self.codec).decompress(self.map[offset:offset + length])
+		return np.frombuffer(data, dtype=dtype).reshape(shape)
+
+	def reference(self, i: int) -> int | None:
+		"""Sample that sample i was stored against"""
+		match self.samples[i]["ref"]:
+			case "prev":
+				return i - 1
+			case "base":
+				return next(j for j in range(i, -1, -1) if self.samples[j]["ref"] == "none")
+			case _:
+				return None
+
+	def payload(self, cls: str, name: str, i: int) -> tuple[int, dict | None]:
+		"""Find the sample that stored an attribute's value for sample i, returning it with the stored payload"""
+		while i is not None:
+			if name in self.samples[i].get(cls, {}):
+				return i, self.samples[i][cls][name]
+			i = self.reference(i)
+		return None, None
 
-def set_data_value(data: Any, value: Any) -> None:
-	if hasattr(data, "vector"):
-		data.vector = value
-	elif hasattr(data, "color"):
-		data.color = value
+	def value(self, cls: str, name: str, i: int) -> Any:
+		"""Read an attribute on sample i, a view of the file if it's stored uncompressed and unquantized"""
+		i, stored = self.payload(cls, name, i)
+		if stored is None:
+			return None
+		payload = {key: self.block(value["block"]) if isinstance(value, dict) and "block" in value else value
+			for key, value in stored.items()}
+		if "bits" in payload or "ranges" in payload:
+			return decode_group(payload)
+		if cls == "detail":
+			return payload["value"]
+		if "strings" in payload:
+			return IndexedStrings(payload["strings"], payload["value"])
+		if self.schema[cls][name]["storage"] == "String" and isinstance(payload["value"], np.ndarray):
+			# The string table is only stored when it changes from the reference sample's,
+			# strings without bulk getters like tuples are stored as plain lists instead of ids
+			while "strings" not in stored:
+				i, stored = self.payload(cls, name, self.reference(i))
+			return IndexedStrings(stored["strings"], payload["value"])
+		return payload_values(self.schema[cls][name], payload)
+
+	def state(self, i: int) -> dict:
+		return {cls: {name: self.value(cls, name, i) for name in entries} for cls, entries in self.schema.items()}
+
+	def frames(self):
+		for i, time in enumerate(self.times):
+			yield time, self.state(i)
+
+def open_frames(filepath: str) -> tuple[dict, Any]:
+	"""Read the schema of an attribute file, returning it with a generator of each sample's time and full state"""
+	with open(filepath, "rb") as file:
+		binary = file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+	if binary:
+		archive = AttributeArchive(filepath)
+		return archive.schema, archive.frames()
+	if is_legacy(filepath):
+		schema, data, frame_count = load_legacy(filepath)
+		return schema, legacy_frames(data, frame_count)
+
+	records = read_attribute_file(filepath)
+	header = next(records)
+	if header.get("format") == ATTRIB_FORMAT:
+		return header["schema"], stream_frames(records, header["schema"])
+	if header.get("format") == MANIFEST_FORMAT:
+		return header["schema"], shard_frames(filepath, header)
+	raise Exception(f"Unknown attribute file format '{header.get('format')}'")
+
+# Values that decide which element each value of a class is written to
+REMAPS = {
+	"point": [("index", "point"), ("point", "id")],
+	"vertex": [("topology", "point"), ("topology", "prim")],
+	"point_group": [("index", "point"), ("point", "id")],
+	"vertex_group": [("topology", "point"), ("topology", "prim")]
+}
+
+def load_attributes(filepath: str, progress=None) -> tuple[dict, dict]:
+	"""Load an attribute file's schema and lists of (frame, value) keys, keyed by class then name.
+
+	Keys are only made on samples where the value changes, plus a hold key on the sample before each change.
+	Samples are keyed at the time they were taken, which can be on subframes or every few frames.
+	Constant attributes end up with a single key. Filtered exports have an index class with the point numbers
+	of each frame, when those change every point attribute is keyed. The same goes for point ids when points
+	are keyed by id, and for vertex attributes when the vertex topology changes.
+	If given, progress is called with the time of each sample as it's decoded.
+	"""
+	if is_legacy(filepath):
+		schema, data, _ = load_legacy(filepath, progress)
+		return schema, data
+	schema, frames = open_frames(filepath)
+	data = {cls: {} for cls in schema}
+	last = {}
+	for frame, state in frames:
+		if progress:
+			progress(frame)
+		# Elements are matched through these classes, so their attributes are keyed whenever they change
+		moved = {cls for cls, remaps in REMAPS.items() if any((remap, name) in last and name in state.get(remap, {})
+			and not same_value(state[remap][name], last[remap, name][1]) for remap, name in remaps)}
+		for cls, attribs in state.items():
+			keys = data[cls]
+			for name, value in attribs.items():
+				if name not in keys:
+					keys[name] = [(frame, value)]
+				elif not same_value(value, last[cls, name][1]) or cls in moved:
+					if last[cls, name][0] != keys[name][-1][0]:
+						keys[name].append(last[cls, name])
+					keys[name].append((frame, value))
+				last[cls, name] = (frame, value)
+	return schema, data
+
+def numeric_keys(keys: list) -> np.ndarray | None:
+	"""Detail values of every key as rows of floats, None for strings, dicts or arrays that change length"""
+	if any(isinstance(value, (dict, str)) for _, value in keys):
+		return None
+	try:
+		values = np.asarray([value for _, value in keys])
+	except ValueError:
+		return None
+	if values.dtype.kind not in "biuf":
+		return None
+	return values.astype(np.float64).reshape(len(keys), -1)
+
+def apply_steps(obj: bpy.types.Object, schema: dict, data: dict, point_groups: str = "ATTRIBUTE", written: dict | None = None):
+	"""Transfer attribute keys from load_attributes onto an object, animating any that have more than one key.
+
+	Yields the name of each attribute once it's written, with empty yields in between so the work can be split up.
+	Live playback passes the same written dict every frame, so strings are only written when they change.
+	"""
+	detail_data = data.get("detail", {})
+	prim_data = data.get("prim", {})
+	point_data = data.get("point", {})
+	vertex_data = data.get("vertex", {})
+
+	# Transfer detail attributes as custom data
+	for attr, keys in detail_data.items():
+		first = keys[0][1]
+		obj[attr] = first
+		# Constant attributes don't need keyframes, only numbers of the same length on every key can be animated
+		if len(keys) > 1 and (values := numeric_keys(keys)) is not None:
+			frames = [frame for frame, _ in keys]
+			interpolation = "CONSTANT" if isinstance(first, (bool, int)) else "LINEAR"
+			for component in range(values.shape[1]):
+				add_fcurve(get_action(obj), f"[\"{attr}\"]", component, frames, values[:, component], interpolation)
+		yield attr
+
+	# Attributes only work on curves, meshes and point clouds
+	if not hasattr(obj.data, "attributes"):
+		return
+
+	# Transfer attributes as mesh data
+	yield from transfer_attributes(prim_data, schema["prim"], "FACE", obj, None, written)
+	point_index = data.get("index", {}).get("point")
+	if schema["point"].get("id", {}).get("key"):
+		point_index = id_keys(obj, point_data["id"])
+	yield from transfer_attributes(point_data, schema["point"], "POINT", obj, point_index, written)
+	# Vertices are matched to corners, which only meshes have
+	if (vertex_data or data.get("vertex_group")) and hasattr(obj.data, "loops"):
+		corners = corner_keys(obj.data, data["topology"])
+		yield from transfer_attributes(vertex_data, schema["vertex"], "CORNER", obj, corners, written)
+		yield from transfer_attributes(data.get("vertex_group", {}), schema.get("vertex_group"), "CORNER", obj, corners)
+
+	# Groups become boolean attributes, point groups can be vertex groups instead
+	yield from transfer_attributes(data.get("prim_group", {}), schema.get("prim_group"), "FACE", obj)
+	if point_groups == "VERTEX_GROUP" and obj.type == "MESH":
+		yield from add_vertex_groups(obj, data.get("point_group", {}), point_index)
 	else:
-		data.value = value
-
-def transfer_attributes(attributes: list[Any], domain: str, obj: bpy.types.Object):
-	for attr in attributes:
-		anim_attr = obj.data.attributes.new(name=attr, type=infer_type(attr, attributes[attr][0][0]), domain=domain)
-		for frame, frame_data in enumerate(attributes[attr]):
-			for i, value in enumerate(frame_data):
-				if isinstance(value, (list, tuple)) and len(value) > 3:
-					continue
-				set_data_value(anim_attr.data[i], value)
-				# Strings and dicts can't be animated in Blender
-				if isinstance(frame_data, (dict, str)):
+		yield from transfer_attributes(data.get("point_group", {}), schema.get("point_group"), "POINT", obj, point_index)
+
+def apply_attributes(obj: bpy.types.Object, schema: dict, data: dict, point_groups: str = "ATTRIBUTE", written: dict | None = None) -> None:
+	"""Transfer attribute keys from load_attributes onto an object in one go"""
+	for _ in apply_steps(obj, schema, data, point_groups, written):
+		pass
+
+def count_steps(data: dict) -> int:
+	"""Number of attribute names apply_steps yields at most for an object"""
+	return sum(len(data.get(cls, {})) for cls in ("detail", "prim", "point", "vertex", "prim_group", "point_group", "vertex_group"))
+
+# DECODED CACHE
+
+def user_cache_dir() -> str:
+	if os.name == "nt":
+		return os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+	return os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+# Decoded attribute files are kept here, so importing the same file again skips decompressing and parsing it
+DECODED_CACHE_DIR = os.path.join(user_cache_dir(), "houdini_attributes")
+DECODED_CACHE_MB = 4096
+DECODED_EXT = ".decoded"
+# Batch imports load several files at once, only one of them evicts at a time
+DECODED_LOCK = threading.Lock()
+
+def file_hash(filepath: str) -> str:
+	digest = hashlib.blake2b()
+	with open(filepath, "rb") as file:
+		while block := file.read(1 << 20):
+			digest.update(block)
+	return digest.hexdigest()
+
+def decoded_path(filepath: str) -> str:
+	path_hash = hashlib.sha1(os.path.abspath(filepath).encode("utf-8")).hexdigest()[:16]
+	return os.path.join(DECODED_CACHE_DIR, f"{os.path.basename(filepath)}.{path_hash}{DECODED_EXT}")
+
+def decoded_dir_safe() -> bool:
+	"""Make the cache folder if needed, checking nobody else can write to it where files have owners"""
+	os.makedirs(DECODED_CACHE_DIR, mode=0o700, exist_ok=True)
+	if not hasattr(os, "getuid"):
+		return True
+	stat = os.stat(DECODED_CACHE_DIR)
+	return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+def pack_value(value: Any, arrays: list) -> dict:
+	"""JSON for a key's value, with arrays moved to the end of a list and referred to by position"""
+	if isinstance(value, IndexedStrings):
+		arrays.append(value.ids)
+		return {"strings": value.strings, "array": len(arrays) - 1}
+	if isinstance(value, np.ndarray):
+		arrays.append(value)
+		return {"array": len(arrays) - 1}
+	return {"value": value}
+
+def unpack_value(packed: dict, arrays: list) -> Any:
+	if "strings" in packed:
+		return IndexedStrings(packed["strings"], arrays[packed["array"]])
+	if "array" in packed:
+		return arrays[packed["array"]]
+	return packed["value"]
+
+def save_decoded(path: str, source: dict, schema: dict, data: dict) -> None:
+	"""Store decoded keys as plain arrays and JSON, which unlike pickles can't run code when they're loaded"""
+	arrays = []
+	keys = {cls: {name: [(frame, pack_value(value, arrays)) for frame, value in keys] for name, keys in attribs.items()}
+		for cls, attribs in data.items()}
+	meta = {"source": source, "schema": schema, "keys": keys, "arrays": len(arrays)}
+	with open(path, "wb") as file:
+		np.savez(file, meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8), **{str(i): array for i, array in enumerate(arrays)})
+
+def read_decoded(archive: Any, meta: dict) -> tuple[dict, dict]:
+	"""Schema and keys of a decoded file opened with np.load"""
+	arrays = [archive[str(i)] for i in range(meta["arrays"])]
+	data = {cls: {name: [(frame, unpack_value(value, arrays)) for frame, value in keys] for name, keys in attribs.items()}
+		for cls, attribs in meta["keys"].items()}
+	return meta["schema"], data
+
+def evict_decoded(keep: str) -> None:
+	"""Delete the least recently used decoded files until the cache fits its size limit"""
+	with DECODED_LOCK:
+		entries = []
+		for name in os.listdir(DECODED_CACHE_DIR):
+			path = os.path.join(DECODED_CACHE_DIR, name)
+			if name.endswith(DECODED_EXT) and path != keep:
+				# Files can still disappear under another Blender instance or a purge
+				try:
+					stat = os.stat(path)
+				except FileNotFoundError:
 					continue
-				obj.data.keyframe_insert(data_path=f"attributes[\"{attr}\"]", index=-1, frame=frame + 1)
+				entries.append((stat.st_mtime, stat.st_size, path))
+		try:
+			total = sum(size for _, size, _ in entries) + os.path.getsize(keep)
+		except FileNotFoundError:
+			return
+		for _, size, path in sorted(entries):
+			if total <= DECODED_CACHE_MB * 1024 * 1024:
+				break
+			try:
+				os.remove(path)
+			except FileNotFoundError:
+				pass
+			total -= size
+
+def shard_stats(filepath: str) -> list:
+	"""Name, size and modification time of each shard a manifest lists, empty for other files"""
+	with open(filepath, "rb") as file:
+		if file.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+			return []
+	if is_legacy(filepath):
+		return []
+	records = read_records(filepath)
+	_, header = next(records, (None, {}))
+	records.close()
+	if header.get("format") != MANIFEST_FORMAT:
+		return []
+	folder = os.path.dirname(filepath)
+	stats = []
+	for shard in header["shards"]:
+		stat = os.stat(os.path.join(folder, shard["file"]))
+		stats.append([shard["file"], stat.st_size, stat.st_mtime_ns])
+	return stats
+
+def load_cached(filepath: str, progress=None) -> tuple[dict, dict]:
+	"""load_attributes, reusing the decoded result of an earlier import if the file is the same.
+
+	Entries are keyed on the file's size and modification time, if only the time changed the contents are hashed
+	to check whether it really changed. Using an entry marks it as recently used. A manifest stays the same when its
+	shards are exported again, so the size and modification time of each shard are part of its key.
+	The cache is skipped if its folder can be written by other users.
+	"""
+	if not decoded_dir_safe():
+		return load_attributes(filepath, progress)
+	stat = os.stat(filepath)
+	source = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": None, "shards": shard_stats(filepath)}
+	path = decoded_path(filepath)
+	try:
+		with np.load(path, allow_pickle=False) as archive:
+			meta = json.loads(archive["meta"].tobytes())
+			key = meta["source"]
+			if key["size"] == source["size"] and key.get("shards") == source["shards"] and (key["mtime"] == source["mtime"] or key["hash"] == file_hash(filepath)):
+				schema, data = read_decoded(archive, meta)
+				os.utime(path)
+				return schema, data
+	except (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile):
+		pass
+
+	schema, data = load_attributes(filepath, progress)
+	source["hash"] = file_hash(filepath)
+	# Written under a temporary name, so an interrupted import never leaves a broken entry
+	save_decoded(path + ".tmp", source, schema, data)
+	os.replace(path + ".tmp", path)
+	evict_decoded(path)
+	return schema, data
+
+def purge_decoded() -> tuple[int, int]:
+	"""Delete every decoded file, returning how many were deleted and their total size"""
+	count = size = 0
+	if os.path.isdir(DECODED_CACHE_DIR):
+		for name in os.listdir(DECODED_CACHE_DIR):
+			if name.endswith((DECODED_EXT, DECODED_EXT + ".tmp")):
+				path = os.path.join(DECODED_CACHE_DIR, name)
+				size += os.path.getsize(path)
+				os.remove(path)
+				count += 1
+	return count, size
+
+# LIVE PLAYBACK
+
+# Frames decoded ahead of the current one while the timeline plays
+READ_AHEAD = 8
+
+def state_bytes(state: dict) -> int:
+	"""Rough memory used by a decoded frame, arrays shared with other frames are counted again"""
+	size = 0
+	for attribs in state.values():
+		for value in attribs.values():
+			if isinstance(value, np.ndarray):
+				size += value.nbytes
+			elif isinstance(value, IndexedStrings):
+				size += value.ids.nbytes
+			else:
+				size += 64
+	return size
+
+def file_stamp(paths: list) -> tuple:
+	"""Size and modification time of each file"""
+	return tuple((stat.st_size, stat.st_mtime_ns) for stat in map(os.stat, paths))
+
+class FramePlayer:
+	"""Decodes the frames of an attribute file on demand, keeping recent ones in an LRU cache of bounded size.
+
+	The file is indexed once without decoding any payloads, recording where each sample's line starts, so any
+	frame can be decoded from the newest cached sample or keyframe before it. The reader is kept after each decode,
+	so frames read in order are only decompressed and decoded once. While the timeline plays, a background thread
+	decodes the frames after the current one.
+	"""
+	def __init__(self, filepath: str, max_bytes: int):
+		self.max_bytes = max_bytes
+		self.cache = OrderedDict()
+		self.size = 0
+		self.lock = threading.RLock()
+		self.reader = ThreadPoolExecutor(1)
+		self.pending = None
+		# Time and file of every sample, the keyframe and full frame it's decoded from, and where its line starts
+		self.times = []
+		self.files = []
+		self.keys = []
+		self.bases = []
+		self.offsets = []
+		# Sample the reader left by the last decode is at
+		self.cursor = None
+		self.archive = None
+
+		with open(filepath, "rb") as file:
+			binary = file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+		self.sources = [filepath]
+		if binary:
+			# Binary files are indexed already and any sample can be read directly
+			self.archive = AttributeArchive(filepath)
+			self.schema = self.archive.schema
+			self.times = self.archive.times
+			self.stamp = file_stamp(self.sources)
+			return
+
+		records = read_records(filepath)
+		_, header = next(records)
+		records.close()
+		if header.get("format") == MANIFEST_FORMAT:
+			folder = os.path.dirname(filepath)
+			shards = sorted(header["shards"], key=lambda shard: shard["frames"][0])
+			files = [os.path.join(folder, shard["file"]) for shard in shards]
+		elif header.get("format") == ATTRIB_FORMAT:
+			files = [filepath]
+		else:
+			raise Exception("Live playback needs a file from a newer exporter, please export it again")
+		self.schema = header["schema"]
+		self.sources = list(dict.fromkeys([filepath, *files]))
+		self.stamp = file_stamp(self.sources)
+		for file in files:
+			self.index_file(file)
+
+	def changed(self) -> bool:
+		"""Whether the file or any of its shards was written since the player was made"""
+		try:
+			return file_stamp(self.sources) != self.stamp
+		except FileNotFoundError:
+			return True
+
+	def close(self) -> None:
+		"""Stop reading ahead and release the file, cached frames can be views of it so they're dropped too"""
+		self.reader.shutdown(cancel_futures=True)
+		with self.lock:
+			self.pending = None
+			if self.cursor is not None:
+				self.cursor[1].close()
+				self.cursor = None
+			self.cache.clear()
+			self.size = 0
+			if self.archive is not None:
+				self.archive.close()
+
+	def index_file(self, filepath: str) -> None:
+		"""Record the time and reference of each sample, with the offset to read it from and the lines to skip there"""
+		lines = read_lines(filepath)
+		last, _ = next(lines)
+		skip = 0
+		for offset, line in lines:
+			# Lines of a compressed chunk share its offset
+			skip = skip + 1 if offset == last else 0
+			last = offset
+			time, ref = record_key(line)
+			self.offsets.append((offset, skip))
+			# Merged files have a full frame at the start of each shard, keyframes refer to the latest one
+			self.bases.append(len(self.times) if ref == "none" else self.bases[-1])
+			self.keys.append(len(self.times) if ref != "prev" else self.keys[-1])
+			self.times.append(time)
+			self.files.append(filepath)
+
+	def lines_from(self, i: int):
+		"""Lines of the file starting at sample i, continuing the last decode's reader if it stopped there"""
+		if self.cursor is not None:
+			index, lines = self.cursor
+			self.cursor = None
+			if index == i:
+				return lines
+			lines.close()
+		offset, skip = self.offsets[i]
+		lines = read_lines(self.files[i], offset)
+		for _ in range(skip):
+			next(lines)
+		return lines
+
+	def store(self, i: int, state: dict) -> None:
+		self.cache[i] = state
+		self.size += state_bytes(state)
+		# The newest frame is always kept, even if it's bigger than the whole cache
+		while self.size > self.max_bytes and len(self.cache) > 1:
+			_, old = self.cache.popitem(last=False)
+			self.size -= state_bytes(old)
+
+	def frame(self, i: int) -> dict:
+		"""Full state of sample i, decoded from its keyframe if it isn't cached"""
+		with self.lock:
+			if i in self.cache:
+				self.cache.move_to_end(i)
+				return self.cache[i]
+			if self.archive is not None:
+				state = self.archive.state(i)
+				self.store(i, state)
+				return state
+
+			# Only the keyframe refers to the full frame, the samples after it refer to the one before them
+			key = self.keys[i]
+			filepath = self.files[i]
+			start = next((j for j in range(i - 1, key - 1, -1) if j in self.cache), None)
+			index = key if start is None else start + 1
+			prev = None if start is None else self.cache[start]
+			base = self.frame(self.bases[key]) if index == key and self.bases[key] != key else None
+			lines = self.lines_from(index)
+			try:
+				for _, line in lines:
+					record = json.loads(line)
+					if record["frame"] != self.times[index]:
+						raise Exception(f"{filepath} changed since it was opened")
+					state = decode_record(record, base, prev, self.schema)
+					self.store(index, state)
+					if index == i:
+						if i + 1 < len(self.times) and self.files[i + 1] == filepath:
+							self.cursor = (i + 1, lines)
+						return state
+					prev = state
+					index += 1
+			finally:
+				if self.cursor is None or self.cursor[1] is not lines:
+					lines.close()
+			raise Exception(f"Frame {self.times[i]} is missing from {filepath}")
+
+	def state_at(self, time: float, playing: bool = False) -> dict:
+		"""State of the last sample at or before a time, reading ahead if the timeline is playing"""
+		i = max(bisect.bisect_right(self.times, time) - 1, 0)
+		state = self.frame(i)
+		if playing and (self.pending is None or self.pending.done()):
+			ahead = [j for j in range(i + 1, min(i + 1 + READ_AHEAD, len(self.times))) if j not in self.cache]
+			if ahead:
+				self.pending = self.reader.submit(lambda: [self.frame(j) for j in ahead])
+		return state
+
+# Players are shared by every object using the same file and cache size
+PLAYERS = {}
+# Strings last written to each object by live playback, by session id as objects can be renamed
+LIVE_STRINGS = {}
+
+def get_player(filepath: str, cache_mb: int) -> FramePlayer:
+	"""Player of a file, made again once the file is exported again as the old one's offsets would be stale"""
+	key = (filepath, cache_mb)
+	player = PLAYERS.get(key)
+	if player is not None and player.changed():
+		# The old player still holds the file open and maps binary files, so it has to let them go
+		player.close()
+		player = None
+	if player is None:
+		player = PLAYERS[key] = FramePlayer(filepath, cache_mb * 1024 * 1024)
+	return player
+
+def single_keys(state: dict, time: float) -> dict:
+	"""Turn a frame's state into keys like load_attributes makes, with a single key each"""
+	return {cls: {name: [(time, value)] for name, value in attribs.items()} for cls, attribs in state.items()}
+
+@bpy.app.handlers.persistent
+def live_playback(scene, depsgraph=None):
+	"""Write the current frame's attributes into every object linked to an attribute file"""
+	playing = bpy.context.screen is not None and bpy.context.screen.is_animation_playing
+	time = scene.frame_current + scene.frame_subframe
+	for obj in scene.objects:
+		filepath = obj.get("houdini_attributes")
+		if not filepath:
+			continue
+		player = get_player(bpy.path.abspath(filepath), obj.get("houdini_cache_mb", 512))
+		written = LIVE_STRINGS.setdefault(obj.session_uid, {})
+		# Points are matched by id against the mesh, which is given the first frame's ids if it has none
+		if player.schema["point"].get("id", {}).get("key") and hasattr(obj.data, "attributes") and obj.data.attributes.get("id") is None:
+			apply_attributes(obj, player.schema, single_keys(player.frame(0), player.times[0]), written=written)
+		apply_attributes(obj, player.schema, single_keys(player.state_at(time, playing), time), written=written)
+
+def import_instances(points_file: str, instance_file: str, col_name: str) -> None:
+	"""Import the instance geometry into a hidden collection, then the points as nulls instancing it"""
+	# Make a collection to contain the instance geometry
+	instance_col = bpy.data.collections.new(col_name)
+	bpy.context.scene.collection.children.link(instance_col)
+	# Make sure it's hidden
+	bpy.context.view_layer.layer_collection.children[-1].exclude = True
+
+	# Import geometry to instance onto nulls
+	auto_import(instance_file)
+
+	# Move geometry to instance collection
+	instances = bpy.context.selected_objects
+	for instance in instances:
+		unlink_everywhere(instance, bpy.context.collection)
+		instance_col.objects.link(instance)
+
+	# Import nulls, never use proxies for this
+	bpy.ops.wm.usd_import(filepath=points_file, import_instance_proxies=False)
+	nulls = bpy.context.selected_objects
+
+	# Instance collection on nulls
+	root = nulls[-1]
+	for null in nulls:
+		if null == root:
+			continue
+		null.instance_collection = instance_col
+		null.instance_type = "COLLECTION"
 
 class Import_Point_Instances(bpy.types.Operator, ImportHelper):
 	"""Import packed points as nulls and link instances to each point"""
@@ -120,38 +1312,39 @@ class Import_Point_Instances(bpy.types.Operator, ImportHelper):
 			self.report({"ERROR_INVALID_INPUT"}, "Please select an instance file!")
 			return {"CANCELLED"}
 
-		# Make a collection to contain the instance geometry
-		instance_col = bpy.data.collections.new(col_name)
-		bpy.context.scene.collection.children.link(instance_col)
-		# Make sure it's hidden
-		bpy.context.view_layer.layer_collection.children[-1].exclude = True	
-
-		# Import geometry to instance onto nulls
 		try:
-			auto_import(instance_file)
+			import_instances(points_file, instance_file, col_name)
 		except Exception as err:
 			self.report({"ERROR_INVALID_INPUT"}, str(err))
 			return {"CANCELLED"}
-		
-		# Move geometry to instance collection
-		instances = bpy.context.selected_objects
-		for instance in instances:
-			unlink_everywhere(instance, bpy.context.collection)
-			instance_col.objects.link(instance)
-
-		# Import nulls, never use proxies for this
-		bpy.ops.wm.usd_import(filepath=points_file, import_instance_proxies=False)
-		nulls = bpy.context.selected_objects
-
-		# Instance collection on nulls
-		root = nulls[-1]
-		for null in nulls:
-			if null == root:
-				continue
-			null.instance_collection = instance_col
-			null.instance_type = "COLLECTION"
 		return {"FINISHED"}
 
+# BACKGROUND IMPORT
+
+# Time spent writing to Blender on each update of a background import
+WRITE_SECONDS = 0.05
+
+class ImportCancelled(Exception):
+	"""Raised in a decoding thread to stop it once its import is cancelled"""
+
+# Datablocks the geometry importers can add, the ones an import made are removed if it's cancelled
+ROLLBACK_DATA = ("objects", "meshes", "curves", "hair_curves", "pointclouds", "materials", "images", "actions", "collections")
+
+def snapshot_data() -> dict:
+	return {name: set(getattr(bpy.data, name)) for name in ROLLBACK_DATA if hasattr(bpy.data, name)}
+
+def added_data(snapshot: dict) -> list:
+	"""Datablocks added since a snapshot with the name of their collection, objects first"""
+	return [(name, block) for name, before in snapshot.items() for block in getattr(bpy.data, name) if block not in before]
+
+def remove_data(blocks: list) -> None:
+	for name, block in blocks:
+		# The user may have deleted it already while the import was running
+		try:
+			getattr(bpy.data, name).remove(block)
+		except ReferenceError:
+			pass
+
 class Import_Geometry_Attributes(bpy.types.Operator, ImportHelper):
 	"""Import geometry and attach attributes from a JSON file"""
 	bl_idname = "houdini.import_geo_attribs"
@@ -159,6 +1352,23 @@ class Import_Geometry_Attributes(bpy.types.Operator, ImportHelper):
 
 	directory: bpy.props.StringProperty(name="Folder", options={"HIDDEN", "SKIP_SAVE"})
 	files: bpy.props.CollectionProperty(name="Files", type=bpy.types.OperatorFileListElement, options={"HIDDEN", "SKIP_SAVE"})
+	point_groups: bpy.props.EnumProperty(name="Point Groups", items=[
+		("ATTRIBUTE", "Attributes", "Import point groups as animated boolean attributes"),
+		("VERTEX_GROUP", "Vertex Groups", "Import point groups as vertex groups, using the first frame")
+	])
+	mode: bpy.props.EnumProperty(name="Mode", items=[
+		("KEYFRAMES", "Keyframes", "Bake the attributes into F-curves"),
+		("LIVE", "Live", "Read the attributes from the file while playing, the .blend file only stores its path")
+	])
+	cache_size: bpy.props.IntProperty(name="Cache Size (MB)", description="Memory used for decoded frames in live mode", default=512, min=16)
+	use_cache: bpy.props.BoolProperty(name="Reuse Decoded Files", description="Keep the decoded attributes on disk, so importing the same file again is faster", default=True)
+	background: bpy.props.BoolProperty(name="Import in Background", description="Decode on another thread and write the attributes a little at a time, so Blender stays responsive. Esc cancels the import", default=True)
+	# Set when started from the file browser, scripts calling the operator need the import finished when it returns
+	interactive: bpy.props.BoolProperty(options={"HIDDEN", "SKIP_SAVE"})
+
+	def invoke(self, context, event):
+		self.interactive = True
+		return ImportHelper.invoke(self, context, event)
 
 	def execute(self, context):
 		if len(self.files) != 2:
@@ -180,62 +1390,305 @@ class Import_Geometry_Attributes(bpy.types.Operator, ImportHelper):
 			self.report({"ERROR_INVALID_INPUT"}, "Please select a geometry file!")
 			return {"CANCELLED"}
 
+		# Only imports started from the file browser run in the background
+		if self.mode == "KEYFRAMES" and self.background and self.interactive:
+			return self.start(context, attrib_file, geo_file)
+
 		try:
 			auto_import(geo_file)
 		except Exception as err:
 			self.report({"ERROR_INVALID_INPUT"}, str(err))
 			return {"CANCELLED"}
 		
-		# Decompress JSON data
-		with gzip.open(attrib_file, "rb") as jsonfile:
-			json_bytes = jsonfile.read()
-			json_str = json_bytes.decode("utf-8")
-			data = json.loads(json_str)
+		# Live mode only links the file, frames are decoded as the timeline moves
+		if self.mode == "LIVE":
+			try:
+				get_player(attrib_file, self.cache_size)
+			except Exception as err:
+				self.report({"ERROR_INVALID_INPUT"}, str(err))
+				return {"CANCELLED"}
+			for obj in bpy.context.selected_objects:
+				obj["houdini_attributes"] = attrib_file
+				obj["houdini_cache_mb"] = self.cache_size
+			live_playback(context.scene)
+			return {"FINISHED"}
 
-			detail_data = data["detail"]
-			prim_data = data["prim"]
-			point_data = data["point"]
-			#vertex_data = data["vertex"]
+		# Decompress JSON data, or reuse it from an earlier import
+		schema, data = load_cached(attrib_file) if self.use_cache else load_attributes(attrib_file)
 
-			for obj in bpy.context.selected_objects:
-				# Transfer detail attributes as custom data
-				for attr in detail_data:
-					for frame, frame_data in enumerate(detail_data[attr]):
-						obj[attr] = frame_data
-						# Strings and dicts can't be animated in Blender
-						if isinstance(frame_data, (dict, str)):
-							continue
-						obj.keyframe_insert(data_path=f"[\"{attr}\"]", index=-1, frame=frame + 1)
-
-				# Attributes only work on curves, meshes and point clouds
-				if not hasattr(obj.data, "attributes"):
-					continue
+		for obj in bpy.context.selected_objects:
+			apply_attributes(obj, schema, data, self.point_groups)
+
+		return {"FINISHED"}
+
+	def start(self, context, attrib_file: str, geo_file: str):
+		"""Decode the attributes on another thread, then write them from the modal timer"""
+		self.attrib_name = os.path.basename(attrib_file)
+		self.added = []
+		self.timer = None
+		self.steps = None
+		self.decoded = None
+		self.cancelled = threading.Event()
+
+		def progress(frame):
+			if self.cancelled.is_set():
+				raise ImportCancelled()
+			self.decoded = frame
+
+		# Decoding starts first, so it runs while the geometry is imported
+		self.decoder = ThreadPoolExecutor(1)
+		self.future = self.decoder.submit(load_cached if self.use_cache else load_attributes, attrib_file, progress)
+		# The interface is blocked while the geometry is imported, so everything added meanwhile comes from it
+		snapshot = snapshot_data()
+		self.old_actions = snapshot.get("actions", set())
+		try:
+			auto_import(geo_file)
+		except Exception as err:
+			self.added = added_data(snapshot)
+			self.stop(context, rollback=True)
+			self.report({"ERROR_INVALID_INPUT"}, str(err))
+			return {"CANCELLED"}
+		self.added = added_data(snapshot)
+
+		self.objects = list(bpy.context.selected_objects)
+		self.timer = context.window_manager.event_timer_add(0.02, window=context.window)
+		context.window_manager.modal_handler_add(self)
+		context.workspace.status_text_set(f"Decoding {self.attrib_name}, press Esc to cancel")
+		return {"RUNNING_MODAL"}
+
+	def modal(self, context, event):
+		if event.type == "ESC":
+			self.stop(context, rollback=True)
+			self.report({"WARNING"}, f"Cancelled importing {self.attrib_name}")
+			return {"CANCELLED"}
+		if event.type != "TIMER":
+			return {"PASS_THROUGH"}
+
+		try:
+			if self.steps is None:
+				if not self.future.done():
+					frame = "" if self.decoded is None else f" frame {self.decoded:g}"
+					context.workspace.status_text_set(f"Decoding {self.attrib_name}{frame}, press Esc to cancel")
+					return {"PASS_THROUGH"}
+				schema, data = self.future.result()
+				self.steps = (step for obj in self.objects for step in apply_steps(obj, schema, data, self.point_groups))
+				self.total = max(count_steps(data) * len(self.objects), 1)
+				self.written = 0
 
-				# Transfer attributes as mesh data
-				transfer_attributes(prim_data, "FACE", obj)
-				transfer_attributes(point_data, "POINT", obj)
-				#transfer_attributes(vertex_data, "CORNER", obj)
-				
+			# Only write for a moment on each update, so the interface keeps up
+			deadline = time.perf_counter() + WRITE_SECONDS
+			for step in self.steps:
+				self.written += step is not None
+				if time.perf_counter() > deadline:
+					break
+			else:
+				self.stop(context)
+				return {"FINISHED"}
+		except Exception as err:
+			self.stop(context, rollback=True)
+			self.report({"ERROR"}, str(err))
+			return {"CANCELLED"}
+
+		context.workspace.status_text_set(f"Writing {self.attrib_name} {min(self.written / self.total, 1):.0%}, press Esc to cancel")
+		return {"RUNNING_MODAL"}
+
+	def cancel(self, context):
+		# Called when Blender ends the operator itself, like when another file is opened
+		self.stop(context)
+
+	def stop(self, context, rollback: bool = False) -> None:
+		self.cancelled.set()
+		self.decoder.shutdown(wait=False)
+		if self.timer is not None:
+			context.window_manager.event_timer_remove(self.timer)
+			self.timer = None
+		context.workspace.status_text_set(None)
+		# Only what this import made is removed, the user can keep working while it runs
+		if rollback:
+			remove_data(self.added + self.new_actions())
+
+	def new_actions(self) -> list:
+		"""Actions made to animate the imported objects"""
+		actions = []
+		for name, block in self.added:
+			if name != "objects":
+				continue
+			try:
+				owners = (block, block.data)
+			except ReferenceError:
+				continue
+			for id_data in owners:
+				anim = getattr(id_data, "animation_data", None)
+				if anim is not None and anim.action is not None and anim.action not in self.old_actions:
+					actions.append(("actions", anim.action))
+		return actions
+
+class Purge_Attribute_Cache(bpy.types.Operator):
+	"""Delete the decoded attribute files kept to make re-imports faster"""
+	bl_idname = "houdini.purge_attribute_cache"
+	bl_label = "Purge Attribute Cache"
+
+	def execute(self, context):
+		count, size = purge_decoded()
+		self.report({"INFO"}, f"Deleted {count} decoded files ({size / (1024 * 1024):.1f} MB)")
 		return {"FINISHED"}
 
+# BATCH IMPORT
+
+def match_pairs(folder: str, names: list[str], first_stem) -> tuple[list[tuple[str, str]], list[str]]:
+	"""Pair up files by name, returning the full paths of each pair sorted by name and the names left unpaired.
+
+	first_stem gives the name a file is matched on if it's the first file of a pair, or None if it isn't. The second
+	file is geometry, matched on its name up to the first dot.
+	"""
+	firsts = {}
+	geos = {}
+	unpaired = []
+	for name in sorted(names):
+		if not os.path.isfile(os.path.join(folder, name)):
+			continue
+		stem = first_stem(name)
+		if stem is not None:
+			# Sharded exports share their manifest's name, which has the fewest dots
+			if stem in firsts and firsts[stem].count(".") <= name.count("."):
+				continue
+			firsts[stem] = name
+		elif name.split(".")[-1].lower() in GEOMETRY_EXTENSIONS and name.split(".")[0] not in geos:
+			geos[name.split(".")[0]] = name
+		else:
+			unpaired.append(name)
+	pairs = [(os.path.join(folder, firsts[stem]), os.path.join(folder, geos[stem])) for stem in sorted(firsts.keys() & geos.keys())]
+	unpaired += [name for stem, name in {**firsts, **geos}.items() if stem not in firsts or stem not in geos]
+	return pairs, unpaired
+
+def attribute_stem(name: str) -> str | None:
+	return name.split(".")[0] if ".json" in name else None
+
+def points_stem(name: str) -> str | None:
+	return name[:name.index("points.usd")].rstrip("._-") if "points.usd" in name else None
+
+def selected_names(operator) -> list[str]:
+	"""Names of the files picked in the file browser, or everything in the folder if none were picked"""
+	return [file.name for file in operator.files if file.name] or os.listdir(operator.directory)
+
+def report_times(operator, rows: list[str], total: int, start: float) -> None:
+	for row in rows:
+		operator.report({"INFO"}, row)
+	operator.report({"INFO"}, f"Imported {len(rows)} of {total} pairs in {time.perf_counter() - start:.2f}s")
+
+class Import_Geometry_Attributes_Batch(bpy.types.Operator, ImportHelper):
+	"""Import every geometry and JSON file pair in a folder or selection, matched by name"""
+	bl_idname = "houdini.import_geo_attribs_batch"
+	bl_label = "Import Pairs"
+
+	directory: bpy.props.StringProperty(name="Folder", options={"HIDDEN", "SKIP_SAVE"})
+	files: bpy.props.CollectionProperty(name="Files", type=bpy.types.OperatorFileListElement, options={"HIDDEN", "SKIP_SAVE"})
+	point_groups: bpy.props.EnumProperty(name="Point Groups", items=[
+		("ATTRIBUTE", "Attributes", "Import point groups as animated boolean attributes"),
+		("VERTEX_GROUP", "Vertex Groups", "Import point groups as vertex groups, using the first frame")
+	])
+	use_cache: bpy.props.BoolProperty(name="Reuse Decoded Files", description="Keep the decoded attributes on disk, so importing the same file again is faster", default=True)
+	threads: bpy.props.IntProperty(name="Threads", description="Attribute files decoded at once, ahead of the geometry being imported", default=4, min=1)
+
+	def execute(self, context):
+		start = time.perf_counter()
+		pairs, unpaired = match_pairs(self.directory, selected_names(self), attribute_stem)
+		if unpaired:
+			self.report({"WARNING"}, f"No matching file for {', '.join(unpaired)}")
+		if not pairs:
+			self.report({"ERROR_INVALID_INPUT"}, "Please select JSON and geometry files with matching names, or a folder containing them")
+			return {"CANCELLED"}
+
+		def decode(attrib_file):
+			decode_start = time.perf_counter()
+			schema, data = load_cached(attrib_file) if self.use_cache else load_attributes(attrib_file)
+			return schema, data, time.perf_counter() - decode_start
+
+		rows = []
+		with ThreadPoolExecutor(self.threads) as pool:
+			# Only a few files are decoded ahead of the one being written, so memory doesn't grow with the batch
+			futures = {i: pool.submit(decode, pairs[i][0]) for i in range(min(self.threads, len(pairs)))}
+			for i, (attrib_file, geo_file) in enumerate(pairs):
+				if i + self.threads < len(pairs):
+					futures[i + self.threads] = pool.submit(decode, pairs[i + self.threads][0])
+				future = futures.pop(i)
+				name = os.path.basename(attrib_file)
+				try:
+					geo_start = time.perf_counter()
+					auto_import(geo_file)
+					geo_time = time.perf_counter() - geo_start
+					objects = list(bpy.context.selected_objects)
+					schema, data, decode_time = future.result()
+					write_start = time.perf_counter()
+					for obj in objects:
+						apply_attributes(obj, schema, data, self.point_groups)
+					write_time = time.perf_counter() - write_start
+				except Exception as err:
+					future.cancel()
+					self.report({"ERROR"}, f"{name}: {err}")
+					continue
+				rows.append(f"{name}: decode {decode_time:.2f}s, geometry {geo_time:.2f}s, write {write_time:.2f}s")
+
+		report_times(self, rows, len(pairs), start)
+		return {"FINISHED"} if rows else {"CANCELLED"}
+
+class Import_Point_Instances_Batch(bpy.types.Operator, ImportHelper):
+	"""Import every points and instance file pair in a folder or selection, matched by name"""
+	bl_idname = "houdini.import_instances_batch"
+	bl_label = "Import Pairs"
+
+	directory: bpy.props.StringProperty(name="Folder", options={"HIDDEN", "SKIP_SAVE"})
+	files: bpy.props.CollectionProperty(name="Files", type=bpy.types.OperatorFileListElement, options={"HIDDEN", "SKIP_SAVE"})
+
+	def execute(self, context):
+		start = time.perf_counter()
+		pairs, unpaired = match_pairs(self.directory, selected_names(self), points_stem)
+		if unpaired:
+			self.report({"WARNING"}, f"No matching file for {', '.join(unpaired)}")
+		if not pairs:
+			self.report({"ERROR_INVALID_INPUT"}, "Please select points and instance files with matching names, or a folder containing them")
+			return {"CANCELLED"}
+
+		rows = []
+		for points_file, instance_file in pairs:
+			name = os.path.basename(instance_file)
+			pair_start = time.perf_counter()
+			try:
+				import_instances(points_file, instance_file, name.split(".")[0])
+			except Exception as err:
+				self.report({"ERROR"}, f"{name}: {err}")
+				continue
+			rows.append(f"{name}: {time.perf_counter() - pair_start:.2f}s")
+
+		report_times(self, rows, len(pairs), start)
+		return {"FINISHED"} if rows else {"CANCELLED"}
+
 def menu_func_import(self, context):
 	self.layout.operator(Import_Point_Instances.bl_idname, text="Houdini: Instances on Points (.any, .usd pair)")
 	self.layout.operator(Import_Geometry_Attributes.bl_idname, text="Houdini: Geometry and Attributes (.any, .json pair)")
+	self.layout.operator(Import_Point_Instances_Batch.bl_idname, text="Houdini: Batch Instances on Points (folder of pairs)")
+	self.layout.operator(Import_Geometry_Attributes_Batch.bl_idname, text="Houdini: Batch Geometry and Attributes (folder of pairs)")
+	self.layout.operator(Purge_Attribute_Cache.bl_idname, text="Houdini: Purge Attribute Cache")
 
 # Dump all classes to register in here
 classes = [
-	Import_Point_Instances, Import_Geometry_Attributes
+	Import_Point_Instances, Import_Geometry_Attributes, Import_Point_Instances_Batch, Import_Geometry_Attributes_Batch,
+	Purge_Attribute_Cache
 ]
 
 def register() -> None:
 	for cls in classes:
 		bpy.utils.register_class(cls)
 	bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
+	if live_playback not in bpy.app.handlers.frame_change_pre:
+		bpy.app.handlers.frame_change_pre.append(live_playback)
 
 def unregister() -> None:
 	for cls in classes:
 		bpy.utils.unregister_class(cls)
 	bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
+	if live_playback in bpy.app.handlers.frame_change_pre:
+		bpy.app.handlers.frame_change_pre.remove(live_playback)
 
 if __name__ == "__main__":
 	register()